@@ -0,0 +1,63 @@
+import argparse
+import time
+from typing import Dict, List
+import pandas as pd
+from result_format import RESULT_FORMATS, dumps, encode_frame, orjson, pa
+
+def load_frame(table: str, csv_path: str = None) -> pd.DataFrame:
+    """Rows of `table` from PostgreSQL, or from a CSV export of it"""
+    if csv_path:
+        return pd.read_csv(csv_path)
+    from database import DatabaseManager
+    result = DatabaseManager().execute_query(f'SELECT * FROM "{table}"')
+    if not result["success"]:
+        raise SystemExit(f"❌ Could not read {table}: {result['error']} (use --csv to read the CSV instead)")
+    return result["data"]
+
+def benchmark(df: pd.DataFrame, formats: List[str], runs: int) -> List[Dict[str, float]]:
+    """Best-of-`runs` encode time and payload size for each format"""
+    rows = []
+    for result_format in formats:
+        if result_format == 'arrow' and pa is None:
+            print("⚠️  Skipping arrow: pyarrow is not installed")
+            continue
+        best = float('inf')
+        payload = ""
+        for _ in range(runs):
+            started = time.perf_counter()
+            payload = dumps({"success": True, **encode_frame(df, result_format)})
+            best = min(best, time.perf_counter() - started)
+        rows.append({
+            "format": result_format,
+            "bytes": len(payload.encode('utf-8')),
+            "seconds": best
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare result payload formats by size and serialization time")
+    parser.add_argument("--table", default="studentperformancefactor", help="Table to read")
+    parser.add_argument("--csv", help="Read rows from this CSV instead of the database")
+    parser.add_argument("--repeat", type=int, default=1, help="Concatenate the rows this many times")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per format (best is reported)")
+    parser.add_argument("--formats", default=",".join(RESULT_FORMATS), help="Comma-separated formats")
+    args = parser.parse_args()
+
+    df = load_frame(args.table, args.csv)
+    if args.repeat > 1:
+        df = pd.concat([df] * args.repeat, ignore_index=True)
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+
+    print(f"📊 {args.table}: {len(df):,} rows x {len(df.columns)} columns, "
+          f"JSON encoder: {'orjson' if orjson else 'json'}")
+    results = benchmark(df, formats, args.runs)
+    baseline = next((r for r in results if r["format"] == "records"), None)
+
+    print(f"{'format':<10} {'bytes':>14} {'ms':>10} {'size':>8} {'speed':>8}")
+    for r in results:
+        size = f"{r['bytes'] / baseline['bytes']:.2f}x" if baseline else "-"
+        speed = f"{baseline['seconds'] / r['seconds']:.1f}x" if baseline else "-"
+        print(f"{r['format']:<10} {r['bytes']:>14,} {r['seconds'] * 1000:>10.1f} {size:>8} {speed:>8}")
+
+if __name__ == "__main__":
+    main()
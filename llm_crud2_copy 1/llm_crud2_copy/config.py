@@ -11,6 +11,52 @@ class Config:
     # --- Groq API Configuration (FIXED) ---
     GROQ_API_KEY = os.getenv("GROQ_API")
     GROQ_MODEL = os.getenv("GROQ_MODEL", "gemma2-9b-it")
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+    LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() in ("1", "true", "yes")
+    LLM_FAST_PATH_ENABLED = os.getenv("LLM_FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+    LLM_VALIDATE_SQL = os.getenv("LLM_VALIDATE_SQL", "true").lower() in ("1", "true", "yes")
+    
+    # --- LLM Rate Limits ---
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 30))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 15000))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 1.0))
+    
+    # --- LLM Resilience ---
+    LLM_SECONDARY_MODEL = os.getenv("LLM_SECONDARY_MODEL", "")
+    LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", 30.0))
+    LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+    LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", 95))
+    LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", 0.5))
+    LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", 3.0))
+    LLM_HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", 8))
+    LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+    LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", 30.0))
+    
+    # --- LLM Response Cache ---
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+    LLM_TEMPLATE_CACHE_ENABLED = os.getenv("LLM_TEMPLATE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    LLM_SEMANTIC_CACHE_ENABLED = os.getenv("LLM_SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+    LLM_SEMANTIC_THRESHOLD = float(os.getenv("LLM_SEMANTIC_THRESHOLD", 0.85))
+    LLM_SEMANTIC_MAX_ENTRIES = int(os.getenv("LLM_SEMANTIC_MAX_ENTRIES", 100000))
+    LLM_EXPLAIN_BATCH_SIZE = int(os.getenv("LLM_EXPLAIN_BATCH_SIZE", 8))
+    
+    # --- MCP Server ---
+    MCP_MAX_WORKERS = int(os.getenv("MCP_MAX_WORKERS", 8))
+    MCP_MAX_IN_FLIGHT = int(os.getenv("MCP_MAX_IN_FLIGHT", 32))
+    MCP_PAGE_SIZE = int(os.getenv("MCP_PAGE_SIZE", 500))
+    MCP_MAX_PAGE_SIZE = int(os.getenv("MCP_MAX_PAGE_SIZE", 5000))
+    MCP_CURSOR_TTL = float(os.getenv("MCP_CURSOR_TTL", 300))
+    MCP_MAX_OPEN_CURSORS = int(os.getenv("MCP_MAX_OPEN_CURSORS", 4))
+    MCP_RESULT_FORMAT = os.getenv("MCP_RESULT_FORMAT", "records")
+    
+    # --- Prompt Schema Context ---
+    SCHEMA_TOKEN_BUDGET = int(os.getenv("SCHEMA_TOKEN_BUDGET", 1500))
+    SCHEMA_CATALOG_CHECK_INTERVAL = float(os.getenv("SCHEMA_CATALOG_CHECK_INTERVAL", 5))
     
     # --- Database Configuration ---
     DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -19,9 +65,31 @@ class Config:
     DB_USER = os.getenv("DB_USER", "postgres")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
     
+    # --- Connection Pool Configuration ---
+    DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))
+    
+    # --- Streaming Query Configuration ---
+    DB_FETCH_SIZE = int(os.getenv("DB_FETCH_SIZE", 10000))
+    
+    # --- CSV Import Configuration ---
+    IMPORT_METHOD = os.getenv("IMPORT_METHOD", "copy")  # "copy" or "insert"
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 50000))
+    IMPORT_PREFETCH_CHUNKS = int(os.getenv("IMPORT_PREFETCH_CHUNKS", 2))
+    ANALYZE_FAST = os.getenv("ANALYZE_FAST", "true").lower() in ("1", "true", "yes")
+    ANALYZE_SAMPLE_SIZE = int(os.getenv("ANALYZE_SAMPLE_SIZE", 10000))
+    IMPORT_COMPACT_TYPES = os.getenv("IMPORT_COMPACT_TYPES", "false").lower() in ("1", "true", "yes")
+    COMPACT_ENUM_MAX_VALUES = int(os.getenv("COMPACT_ENUM_MAX_VALUES", 16))
+    IMPORT_MAX_WORKERS = int(os.getenv("IMPORT_MAX_WORKERS", 4))
+    IMPORT_CHECKPOINT_BYTES = int(os.getenv("IMPORT_CHECKPOINT_BYTES", 64 * 1024 * 1024))
+    
     @property
     def database_url(self) -> str:
         """
         Generates the full database connection URL.
         """
-        return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
\ No newline at end of file
+        return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
@@ -1,11 +1,325 @@
+import argparse
+import hashlib
+import io
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import os
+import psycopg2
+from psycopg2 import errors as pg_errors
+from psycopg2.extras import execute_values
+from config import Config
 from database import DatabaseManager
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Iterator, Optional, Callable
+
+# Errors that mean COPY is not allowed here (e.g. managed Postgres without the
+# privilege, or a proxy that does not speak the COPY sub-protocol)
+COPY_UNAVAILABLE_ERRORS = (
+    pg_errors.InsufficientPrivilege,
+    psycopg2.NotSupportedError,
+)
+
+# SQLSTATEs a compact column raises for a value its sample did not show: a
+# number outside SMALLINT/INTEGER (22003) or a label missing from an ENUM (22P02)
+COMPACT_TYPE_SQLSTATES = ('22003', '22P02')
+
+# Compact integer columns are narrowed only when the sample stays this many
+# times below the type's limit, since the rest of the file may hold larger values
+COMPACT_INT_HEADROOM = 10
+
+def clean_column_name(name: str) -> str:
+    """Normalize a CSV header into the column name used in PostgreSQL"""
+    return name.lower().replace(' ', '_')
+
+def print_progress(rows_loaded: int, rows_per_second: float):
+    """Default import progress reporter"""
+    print(f"  Imported {rows_loaded:,} rows ({rows_per_second:,.0f} rows/s)")
+
+def count_csv_rows(filepath: str, buffer_size: int = 1 << 22) -> int:
+    """Count data rows by scanning raw bytes for newlines (header excluded).
+
+    Quoted fields that contain newlines are counted as extra rows, so treat the
+    result as exact only for files without embedded line breaks.
+    """
+    newlines = 0
+    last_byte = b"\n"
+    with open(filepath, 'rb') as f:
+        while True:
+            block = f.read(buffer_size)
+            if not block:
+                break
+            newlines += block.count(b"\n")
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        newlines += 1
+    return max(newlines - 1, 0)
+
+def sample_csv(filepath: str, sample_size: int, head_rows: int = 100, seed: int = 0) -> pd.DataFrame:
+    """Parse a sample of rows drawn from random byte offsets across the file.
+
+    The first `head_rows` rows are always included. Each random offset is
+    advanced to the next line start, so only `sample_size` short reads are
+    needed no matter how large the file is. Values are kept as the raw CSV
+    strings, which is what COPY will see.
+    """
+    rng = random.Random(seed)
+    file_size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        lines = []
+        for _ in range(head_rows):
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line)
+        
+        head_end = f.tell()
+        if head_end < file_size:
+            offsets = sorted(rng.randrange(head_end, file_size) for _ in range(sample_size))
+            for offset in offsets:
+                f.seek(offset)
+                f.readline()  # skip the partial line we landed in
+                line = f.readline()
+                if line:
+                    lines.append(line)
+    
+    if data_start == file_size:
+        return pd.read_csv(filepath, nrows=0, dtype=str)
+    
+    body = b"".join(line if line.endswith(b"\n") else line + b"\n" for line in lines)
+    return pd.read_csv(io.BytesIO(header + body), on_bad_lines='skip', dtype=str)
+
+def classify_values(series: pd.Series) -> Tuple[str, pd.Series]:
+    """Return (kind, non-null values converted to it) for a sampled column.
+
+    `kind` is 'integer', 'float', 'boolean', 'timestamp' or 'text'. Samples
+    should be read with `dtype=str`: COPY loads the raw text, so a column is
+    only integer when no sampled value has a decimal point or exponent
+    ("7.0" would be rejected by an INTEGER column).
+    """
+    values = series.dropna()
+    kind = series.dtype.kind
+    if kind in 'iu':
+        return 'integer', values
+    if kind == 'f':
+        return 'float', values
+    if kind == 'b':
+        return 'boolean', values
+    if kind == 'M':
+        return 'timestamp', values
+    if not len(values):
+        return 'text', values
+    
+    text = values.astype(str).str.strip()
+    if text.str.fullmatch(r'[+-]?\d+').all():
+        return 'integer', pd.to_numeric(text)
+    numeric = pd.to_numeric(text, errors='coerce')
+    if numeric.notna().all():
+        return 'float', numeric.astype('float64')
+    if text.str.lower().isin(['true', 'false']).all():
+        return 'boolean', text.str.lower() == 'true'
+    return 'text', values
+
+def infer_pg_type(series: pd.Series) -> str:
+    """Map a sampled column (ideally read as strings) to a PostgreSQL type"""
+    kind, values = classify_values(series)
+    
+    if kind == 'integer':
+        if len(values) and (values.abs().max() >= 2 ** 31):
+            return 'BIGINT'
+        return 'INTEGER'
+    elif kind == 'float':
+        # DECIMAL(10,2) tops out below 1e8; leave room for values outside the sample
+        if len(values) and values.abs().max() >= 1e7:
+            return 'DOUBLE PRECISION'
+        return 'DECIMAL(10,2)'
+    elif kind == 'boolean':
+        return 'BOOLEAN'
+    elif kind == 'timestamp':
+        return 'TIMESTAMP'
+    
+    # For strings, estimate length with headroom for rows the sample missed
+    max_len = values.astype(str).str.len().max() if len(values) else 0
+    if max_len <= 50:
+        return 'VARCHAR(100)'
+    elif max_len <= 127:
+        return 'VARCHAR(255)'
+    return 'TEXT'
+
+def infer_compact_pg_type(series: pd.Series, max_enum_values: int) -> Tuple[str, Optional[List[str]]]:
+    """Pick the narrowest PostgreSQL type for a sampled column.
+
+    Returns the type and, for low-cardinality text columns, the ENUM labels.
+    Integers keep COMPACT_INT_HEADROOM over the sampled range, but labels come
+    from the sample as-is; the importers widen a column back to its default
+    type when the load hits a value the compact type rejects.
+    """
+    _, values = classify_values(series)
+    default_type = infer_pg_type(series)
+    
+    if default_type in ('INTEGER', 'BIGINT') and len(values):
+        largest = values.abs().max() * COMPACT_INT_HEADROOM
+        if largest < 2 ** 15:
+            return 'SMALLINT', None
+        if largest < 2 ** 31:
+            return 'INTEGER', None
+        return default_type, None
+    
+    if default_type in ('DECIMAL(10,2)', 'DOUBLE PRECISION') and len(values):
+        # REAL keeps ~6 significant digits; only use it when that is lossless
+        if (values.map(lambda v: float(f"{v:.6g}")) == values).all():
+            return 'REAL', None
+        return default_type, None
+    
+    if default_type.startswith('VARCHAR') and len(values):
+        labels = sorted(values.astype(str).unique())
+        if len(labels) <= max_enum_values:
+            return 'ENUM', labels
+    
+    return default_type, None
+
+def estimate_column_bytes(pg_type: str, series: pd.Series) -> float:
+    """Rough per-row on-disk width of a column, ignoring alignment padding"""
+    fixed_widths = {
+        'SMALLINT': 2, 'INTEGER': 4, 'BIGINT': 8, 'REAL': 4,
+        'DOUBLE PRECISION': 8, 'BOOLEAN': 1, 'TIMESTAMP': 8, 'ENUM': 4,
+        'DECIMAL(10,2)': 9,
+    }
+    if pg_type in fixed_widths:
+        return fixed_widths[pg_type]
+    values = series.dropna()
+    avg_len = values.astype(str).str.len().mean() if len(values) else 0
+    # Short varlena values carry a 1-byte header
+    return avg_len + 1
+
+def enum_type_name(table_name: str, column_name: str) -> str:
+    return f"{table_name}_{column_name}_enum"
+
+def silent_progress(rows_loaded: int, rows_per_second: float):
+    """Progress reporter used by batch workers, which report once at the end"""
+
+class ByteRangeReader:
+    """File-like view over [start, end) of a file, fed to COPY FROM STDIN"""
+
+    def __init__(self, f, start: int, end: int):
+        self.f = f
+        self.remaining = end - start
+        self.f.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        limit = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.f.readline(limit)
+        self.remaining -= len(data)
+        return data
+
+def partition_csv(filepath: str, partitions: int) -> List[Tuple[int, int]]:
+    """Split the data rows of a CSV into byte ranges that start on line boundaries.
+
+    Like count_csv_rows, this assumes no quoted field spans a line break.
+    """
+    file_size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        f.readline()
+        data_start = f.tell()
+        boundaries = [data_start]
+        span = file_size - data_start
+        for i in range(1, max(1, partitions)):
+            f.seek(data_start + span * i // partitions)
+            f.readline()
+            boundaries.append(min(f.tell(), file_size))
+    boundaries.append(file_size)
+    boundaries = sorted(set(boundaries))
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+def _import_file_worker(data_folder: str, filename: str, method: str, compact: bool) -> Dict[str, Any]:
+    """Process-pool entry point: import one whole file on a fresh connection"""
+    # A forked worker inherits the parent's pool, whose sockets the parent still
+    # uses; open a connection of our own instead
+    importer = CSVImporter(use_pool=False)
+    importer.data_folder = data_folder
+    try:
+        result = importer.import_csv_to_table(filename, method=method, compact=compact,
+                                              progress_callback=silent_progress)
+    finally:
+        importer.db_manager.disconnect()
+    result['filename'] = filename
+    return result
+
+def _copy_range_worker(filepath: str, table_name: str, columns: List[str],
+                       start: int, end: int) -> Dict[str, Any]:
+    """Process-pool entry point: COPY one byte range of a CSV in its own transaction"""
+    # Never use the pool inherited from the parent: concurrent COPYs on its
+    # shared sockets would corrupt the protocol stream
+    db_manager = DatabaseManager(use_pool=False)
+    copy_sql = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    try:
+        with db_manager.borrow_connection() as conn, open(filepath, 'rb') as f:
+            conn.autocommit = False
+            cursor = conn.cursor()
+            try:
+                cursor.copy_expert(copy_sql, ByteRangeReader(f, start, end))
+                conn.commit()
+                return {'success': True, 'start': start, 'end': end, 'imported_rows': cursor.rowcount}
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+                conn.autocommit = True
+    except Exception as e:
+        return {'success': False, 'start': start, 'end': end, 'imported_rows': 0, 'error': str(e),
+                'pgcode': getattr(e, 'pgcode', None)}
+    finally:
+        db_manager.disconnect()
+
+CHECKPOINT_TABLE = "csv_import.checkpoints"
+
+CHECKPOINT_DDL = f"""
+CREATE SCHEMA IF NOT EXISTS csv_import;
+CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+    filename TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    byte_offset BIGINT NOT NULL,
+    row_count BIGINT NOT NULL,
+    prefix_sha256 TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (filename, table_name)
+);
+"""
+
+def hash_file_prefix(filepath: str, length: int, buffer_size: int = 1 << 22):
+    """Return a sha256 object fed with the first `length` bytes of the file"""
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(filepath, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(buffer_size, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
 
 class CSVImporter:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, use_pool: Optional[bool] = None):
+        self.config = Config()
+        self.db_manager = DatabaseManager(use_pool=use_pool)
         self.data_folder = "data"
     
     def get_csv_files(self) -> List[str]:
@@ -19,80 +333,117 @@ class CSVImporter:
                 csv_files.append(file)
         return csv_files
     
-    def analyze_csv(self, filename: str) -> Dict[str, Any]:
-        """Analyze CSV file structure"""
+    def analyze_csv(self, filename: str, count_rows: bool = True, fast: bool = None,
+                    sample_size: int = None, compact: bool = None) -> Dict[str, Any]:
+        """Analyze CSV file structure.
+
+        In fast mode rows are counted by scanning raw bytes for newlines and types
+        are inferred from a sample spread across the whole file; otherwise the
+        first 5 rows are used and the file is parsed with pandas to count rows.
+        With `compact`, columns get the narrowest type the sample allows and the
+        result carries an on-disk size estimate against the default types; the
+        spread sample is then always used, since SMALLINT ranges and ENUM
+        labels picked from 5 rows would reject later values during the load.
+        """
         filepath = os.path.join(self.data_folder, filename)
+        fast = self.config.ANALYZE_FAST if fast is None else fast
+        compact = self.config.IMPORT_COMPACT_TYPES if compact is None else compact
+        sample_size = sample_size or self.config.ANALYZE_SAMPLE_SIZE
         
         try:
-            # Read first few rows to analyze structure
+            # Read first few rows to show as a preview
             df = pd.read_csv(filepath, nrows=5)
+            if fast or compact:
+                sample_df = sample_csv(filepath, sample_size)
+            else:
+                sample_df = pd.read_csv(filepath, nrows=5, dtype=str)
             
             # Infer PostgreSQL data types
             column_info = []
+            default_row_bytes = 0.0
+            compact_row_bytes = 0.0
             for col in df.columns:
-                dtype = df[col].dtype
                 sample_values = df[col].dropna().head(3).tolist()
-                
-                # Map pandas dtypes to PostgreSQL types
-                if dtype == 'int64':
-                    pg_type = 'INTEGER'
-                elif dtype == 'float64':
-                    pg_type = 'DECIMAL(10,2)'
-                elif dtype == 'bool':
-                    pg_type = 'BOOLEAN'
-                elif dtype == 'datetime64[ns]':
-                    pg_type = 'TIMESTAMP'
-                else:
-                    # For strings, estimate length
-                    max_len = df[col].astype(str).str.len().max()
-                    if max_len <= 50:
-                        pg_type = 'VARCHAR(100)'
-                    elif max_len <= 255:
-                        pg_type = 'VARCHAR(255)'
-                    else:
-                        pg_type = 'TEXT'
-                
-                column_info.append({
+                pg_type = infer_pg_type(sample_df[col])
+                info = {
                     'name': col,
                     'type': pg_type,
                     'sample_values': sample_values
-                })
+                }
+                if compact:
+                    compact_type, enum_values = infer_compact_pg_type(
+                        sample_df[col], self.config.COMPACT_ENUM_MAX_VALUES
+                    )
+                    info['type'] = compact_type
+                    info['default_type'] = pg_type
+                    if enum_values is not None:
+                        info['enum_values'] = enum_values
+                    default_row_bytes += estimate_column_bytes(pg_type, sample_df[col])
+                    compact_row_bytes += estimate_column_bytes(compact_type, sample_df[col])
+                column_info.append(info)
             
-            # Get total row count
-            total_rows = len(pd.read_csv(filepath))
+            # Get total row count (skipped when the caller counts rows itself)
+            if not count_rows:
+                total_rows = None
+            elif fast:
+                total_rows = count_csv_rows(filepath)
+            else:
+                total_rows = len(pd.read_csv(filepath))
             
-            return {
+            result = {
                 'success': True,
                 'filename': filename,
                 'columns': column_info,
                 'total_rows': total_rows,
+                'sampled_rows': len(sample_df),
                 'sample_data': df.to_dict('records')
             }
             
+            if compact:
+                rows = total_rows if total_rows is not None else len(sample_df)
+                result['storage_estimate'] = {
+                    'default_bytes': int(default_row_bytes * rows),
+                    'compact_bytes': int(compact_row_bytes * rows),
+                    'saved_bytes': int((default_row_bytes - compact_row_bytes) * rows)
+                }
+            
+            return result
+            
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def create_table_from_csv(self, filename: str, table_name: str = None) -> Dict[str, Any]:
-        """Create PostgreSQL table from CSV structure"""
+    def create_table_from_csv(self, filename: str, table_name: str = None,
+                              compact: bool = None, unlogged: bool = False,
+                              type_owner: str = None) -> Dict[str, Any]:
+        """Create PostgreSQL table from CSV structure.
+
+        `type_owner` names ENUM types after another table, so a staging table
+        shares the live table's types.
+        """
         if not table_name:
             table_name = filename.replace('.csv', '').lower()
         
-        analysis = self.analyze_csv(filename)
+        analysis = self.analyze_csv(filename, count_rows=False, compact=compact)
         if not analysis['success']:
             return analysis
         
-        # Generate CREATE TABLE SQL
+        # Create or extend ENUM types, then generate CREATE TABLE SQL
         columns_sql = []
         for col in analysis['columns']:
-            col_name = col['name'].lower().replace(' ', '_')
+            col_name = clean_column_name(col['name'])
             col_type = col['type']
+            if col_type == 'ENUM':
+                col_type = enum_type_name(type_owner or table_name, col_name)
+                enum_result = self.ensure_enum_type(col_type, col['enum_values'])
+                if not enum_result['success']:
+                    return enum_result
             columns_sql.append(f"{col_name} {col_type}")
         
         create_sql = f"""
-        CREATE TABLE IF NOT EXISTS {table_name} (
+        CREATE {'UNLOGGED ' if unlogged else ''}TABLE IF NOT EXISTS {table_name} (
             {', '.join(columns_sql)}
         );
         """
@@ -105,61 +456,645 @@ class CSVImporter:
                 'success': True,
                 'table_name': table_name,
                 'sql': create_sql,
-                'columns': analysis['columns']
+                'columns': analysis['columns'],
+                'storage_estimate': analysis.get('storage_estimate')
             }
         else:
             return result
     
-    def import_csv_to_table(self, filename: str, table_name: str = None) -> Dict[str, Any]:
-        """Import CSV data into PostgreSQL table"""
+    def ensure_enum_type(self, type_name: str, labels: List[str]) -> Dict[str, Any]:
+        """Create ENUM `type_name`, or add the labels an existing type lacks.
+
+        A type left by an earlier import (or shared with the live table) may
+        have been built from a different sample, so it is never reused as-is.
+        Each statement runs in autocommit, so added labels are usable by the
+        load that follows.
+        """
+        existing = self.db_manager.execute_query(
+            "SELECT to_regtype(%s) IS NOT NULL AS present, "
+            "ARRAY(SELECT enumlabel::text FROM pg_enum WHERE enumtypid = to_regtype(%s)) AS labels",
+            (type_name, type_name)
+        )
+        if not existing['success']:
+            return existing
+        row = existing['data'].iloc[0]
+        
+        if not row['present']:
+            quoted = ', '.join(['%s'] * len(labels))
+            return self.db_manager.execute_query(
+                f"CREATE TYPE {type_name} AS ENUM ({quoted})", tuple(str(v) for v in labels)
+            )
+        
+        current = set(row['labels'] or [])
+        for label in labels:
+            if str(label) not in current:
+                result = self.db_manager.execute_query(
+                    f"ALTER TYPE {type_name} ADD VALUE IF NOT EXISTS %s", (str(label),)
+                )
+                if not result['success']:
+                    return result
+        return {'success': True}
+    
+    def widen_compact_columns(self, table_name: str, columns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Switch compact columns of `table_name` back to their default types.
+
+        Used when a load hits a value the sample did not show (an integer past
+        SMALLINT, a label missing from an ENUM). Values go through text, which
+        every compact type casts to and from.
+        """
+        widened = []
+        for col in columns:
+            default_type = col.get('default_type')
+            if not default_type or col['type'] == default_type:
+                continue
+            col_name = clean_column_name(col['name'])
+            result = self.db_manager.execute_query(
+                f"ALTER TABLE {table_name} ALTER COLUMN {col_name} "
+                f"TYPE {default_type} USING {col_name}::text::{default_type}"
+            )
+            if not result['success']:
+                return result
+            col['type'] = default_type
+            col.pop('enum_values', None)
+            widened.append(col_name)
+        return {'success': True, 'widened': widened}
+    
+    def iter_csv_chunks(self, filepath: str, chunk_size: int = None) -> Iterator[pd.DataFrame]:
+        """Yield the CSV in chunks of `chunk_size` rows with cleaned column names.
+
+        Values are kept as text so a chunk that happens to contain a NULL does
+        not turn an integer column into floats; PostgreSQL casts on load.
+        """
+        chunk_size = chunk_size or self.config.IMPORT_CHUNK_SIZE
+        header = pd.read_csv(filepath, nrows=0).columns
+        columns = [clean_column_name(col) for col in header]
+        reader = pd.read_csv(filepath, chunksize=chunk_size, header=0, names=columns, dtype=str)
+        for chunk in reader:
+            yield chunk
+
+    def _prefetch(self, chunks: Iterator[pd.DataFrame], depth: int) -> Iterator[pd.DataFrame]:
+        """Parse upcoming chunks on a background thread while the caller loads the current one.
+
+        At most `depth` parsed chunks wait in the queue, which bounds peak memory
+        to roughly (depth + 2) * chunk size.
+        """
+        chunk_queue = queue.Queue(maxsize=max(1, depth))
+        stop = threading.Event()
+        done = object()
+
+        def producer():
+            try:
+                for chunk in chunks:
+                    while not stop.is_set():
+                        try:
+                            chunk_queue.put(chunk, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+                chunk_queue.put(done)
+            except Exception as e:
+                chunk_queue.put(e)
+
+        reader_thread = threading.Thread(target=producer, name="csv-reader", daemon=True)
+        reader_thread.start()
+        try:
+            while True:
+                item = chunk_queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            reader_thread.join(timeout=1)
+
+    def _copy_rows(self, cursor, table_name: str, columns: List[str], df: pd.DataFrame) -> int:
+        """Stream a DataFrame into the table with COPY FROM STDIN"""
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        copy_sql = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        cursor.copy_expert(copy_sql, buffer)
+        return cursor.rowcount if cursor.rowcount >= 0 else len(df)
+
+    def _insert_rows(self, cursor, table_name: str, columns: List[str], df: pd.DataFrame) -> int:
+        """Multi-row INSERT fallback for servers where COPY is not permitted"""
+        insert_sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES %s"
+        values = [tuple(row) for row in df.astype(object).where(pd.notnull(df), None).values]
+        execute_values(cursor, insert_sql, values, page_size=self.config.IMPORT_BATCH_SIZE)
+        return len(values)
+
+    def load_dataframe(self, cursor, table_name: str, df: pd.DataFrame, method: str = "copy") -> Tuple[int, str]:
+        """Load one DataFrame inside the caller's transaction.
+
+        Returns the number of rows loaded and the method actually used. When COPY
+        is rejected, the attempt is rolled back to a savepoint and the rows are
+        sent with execute_values instead.
+        """
+        columns = list(df.columns)
+        if method == "copy":
+            cursor.execute("SAVEPOINT bulk_copy")
+            try:
+                loaded = self._copy_rows(cursor, table_name, columns, df)
+                cursor.execute("RELEASE SAVEPOINT bulk_copy")
+                return loaded, "copy"
+            except COPY_UNAVAILABLE_ERRORS as e:
+                print(f"COPY not available ({e.__class__.__name__}), falling back to multi-row INSERT")
+                cursor.execute("ROLLBACK TO SAVEPOINT bulk_copy")
+        return self._insert_rows(cursor, table_name, columns, df), "insert"
+
+    def import_csv_to_table(self, filename: str, table_name: str = None, method: str = None,
+                            chunk_size: int = None, compact: bool = None,
+                            progress_callback: Optional[Callable[[int, float], None]] = None,
+                            create_table: bool = True,
+                            columns: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Stream CSV data into a PostgreSQL table in a single transaction.
+
+        The file is parsed in `chunk_size` row chunks on a reader thread while the
+        previous chunk is being loaded, so memory stays bounded regardless of file
+        size. `progress_callback(rows_loaded, rows_per_second)` is called per chunk.
+        If a compact column rejects a value, the compact columns (from the
+        created table, or `columns` when `create_table` is False) are widened
+        to their default types and the load is retried once.
+        """
         if not table_name:
             table_name = filename.replace('.csv', '').lower()
+        method = method or self.config.IMPORT_METHOD
+        progress_callback = progress_callback or print_progress
         
         filepath = os.path.join(self.data_folder, filename)
         
         try:
-            # Read CSV file
-            df = pd.read_csv(filepath)
+            # Create table first
+            if create_table:
+                create_result = self.create_table_from_csv(filename, table_name, compact=compact)
+                if not create_result['success']:
+                    return create_result
+                columns = create_result['columns']
             
-            # Clean column names
-            df.columns = [col.lower().replace(' ', '_') for col in df.columns]
+            used_method = method
+            started = time.monotonic()
+            widened = False
+            while True:
+                total_rows = 0
+                total_imported = 0
+                with self.db_manager.borrow_connection() as conn:
+                    conn.autocommit = False
+                    cursor = conn.cursor()
+                    try:
+                        chunks = self._prefetch(
+                            self.iter_csv_chunks(filepath, chunk_size),
+                            self.config.IMPORT_PREFETCH_CHUNKS
+                        )
+                        for chunk in chunks:
+                            total_rows += len(chunk)
+                            loaded, used_method = self.load_dataframe(cursor, table_name, chunk, used_method)
+                            total_imported += loaded
+                            elapsed = max(time.monotonic() - started, 1e-9)
+                            progress_callback(total_imported, total_imported / elapsed)
+                        conn.commit()
+                        error = None
+                    except Exception as e:
+                        conn.rollback()
+                        error = e
+                    finally:
+                        cursor.close()
+                        conn.autocommit = True
+                
+                if error is None:
+                    break
+                if not widened and columns and getattr(error, 'pgcode', None) in COMPACT_TYPE_SQLSTATES:
+                    widened = True
+                    widen_result = self.widen_compact_columns(table_name, columns)
+                    if widen_result['success'] and widen_result['widened']:
+                        print(f"Compact types rejected a value ({error.__class__.__name__}), "
+                              f"retrying with default types for {', '.join(widen_result['widened'])}")
+                        continue
+                print(f"Error importing rows: {error}")
+                return {
+                    'success': False,
+                    'table_name': table_name,
+                    'imported_rows': 0,
+                    'error': str(error)
+                }
+            
+            elapsed = time.monotonic() - started
+            return {
+                'success': True,
+                'table_name': table_name,
+                'total_rows': total_rows,
+                'imported_rows': total_imported,
+                'method': used_method,
+                'elapsed_seconds': round(elapsed, 3),
+                'rows_per_second': round(total_imported / elapsed, 1) if elapsed > 0 else None,
+                'message': f"Successfully imported {total_imported} rows into {table_name}"
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _copy_table_indexes(self, cursor, table_name: str, staging_table: str) -> Tuple[List[str], List[str]]:
+        """Recreate the live table's constraints and indexes on the staging table.
+
+        Everything is created under a `__staging` suffixed name (index names are
+        schema-wide) and renamed back during the swap. Returns the renamed
+        constraint and index names.
+        """
+        cursor.execute(
+            """SELECT con.conname, pg_get_constraintdef(con.oid)
+            FROM pg_constraint con
+            JOIN pg_class rel ON rel.oid = con.conrelid
+            JOIN pg_namespace ns ON ns.oid = rel.relnamespace
+            WHERE ns.nspname = 'public' AND rel.relname = %s AND con.contype IN ('p', 'u')""",
+            (table_name,)
+        )
+        constraints = cursor.fetchall()
+        for conname, definition in constraints:
+            cursor.execute(f"ALTER TABLE {staging_table} ADD CONSTRAINT {conname}__staging {definition}")
+        
+        cursor.execute(
+            """SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.schemaname = 'public' AND i.tablename = %s
+            AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conname = i.indexname)""",
+            (table_name,)
+        )
+        indexes = cursor.fetchall()
+        for indexname, indexdef in indexes:
+            indexdef = indexdef.replace(f"INDEX {indexname} ON ", f"INDEX {indexname}__staging ON ", 1)
+            indexdef = indexdef.replace(f" ON public.{table_name} ", f" ON public.{staging_table} ", 1)
+            cursor.execute(indexdef)
+        
+        return [c[0] for c in constraints], [i[0] for i in indexes]
+
+    def import_csv_staged(self, filename: str, table_name: str = None, index_columns: List[str] = None,
+                          method: str = None, chunk_size: int = None, compact: bool = None,
+                          progress_callback: Optional[Callable[[int, float], None]] = None) -> Dict[str, Any]:
+        """Reload a table without exposing partial data to readers.
+
+        Rows are bulk loaded into an UNLOGGED, index-free staging table. The
+        table is then made durable, the live table's constraints and indexes
+        (plus `index_columns`) are built, ANALYZE runs, and the staging table
+        replaces the live one by rename inside a single transaction.
+        """
+        if not table_name:
+            table_name = filename.replace('.csv', '').lower()
+        staging_table = f"{table_name}__staging"
+        old_table = f"{table_name}__old"
+        started = time.monotonic()
+        timings = {}
+        
+        try:
+            drop_result = self.db_manager.execute_query(f"DROP TABLE IF EXISTS {staging_table}")
+            if not drop_result['success']:
+                return drop_result
+            
+            create_result = self.create_table_from_csv(filename, staging_table, compact=compact,
+                                                       unlogged=True, type_owner=table_name)
+            if not create_result['success']:
+                return create_result
+            
+            load_result = self.import_csv_to_table(filename, staging_table, method=method, chunk_size=chunk_size,
+                                                   progress_callback=progress_callback, create_table=False,
+                                                   columns=create_result['columns'])
+            timings['load'] = round(time.monotonic() - started, 3)
+            if not load_result['success']:
+                self.db_manager.execute_query(f"DROP TABLE IF EXISTS {staging_table}")
+                return load_result
+            
+            with self.db_manager.borrow_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    # Build phase runs in autocommit; nothing here is visible to readers yet
+                    step = time.monotonic()
+                    cursor.execute(f"ALTER TABLE {staging_table} SET LOGGED")
+                    cursor.execute("SELECT to_regclass(%s)", (f"public.{table_name}",))
+                    live_exists = cursor.fetchone()[0] is not None
+                    constraints, indexes = [], []
+                    if live_exists:
+                        constraints, indexes = self._copy_table_indexes(cursor, table_name, staging_table)
+                    for col in index_columns or []:
+                        index_name = f"{table_name}_{col}_idx"
+                        if index_name not in indexes:
+                            cursor.execute(f"CREATE INDEX {index_name}__staging ON {staging_table} ({col})")
+                            indexes.append(index_name)
+                    timings['indexes'] = round(time.monotonic() - step, 3)
+                    
+                    step = time.monotonic()
+                    cursor.execute(f"ANALYZE {staging_table}")
+                    timings['analyze'] = round(time.monotonic() - step, 3)
+                    
+                    # Swap phase: one short transaction holding the exclusive lock
+                    step = time.monotonic()
+                    conn.autocommit = False
+                    if live_exists:
+                        cursor.execute(f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE")
+                        cursor.execute(f"ALTER TABLE {table_name} RENAME TO {old_table}")
+                    cursor.execute(f"ALTER TABLE {staging_table} RENAME TO {table_name}")
+                    if live_exists:
+                        cursor.execute(f"DROP TABLE {old_table}")
+                    for conname in constraints:
+                        cursor.execute(f"ALTER TABLE {table_name} RENAME CONSTRAINT {conname}__staging TO {conname}")
+                    for index_name in indexes:
+                        cursor.execute(f"ALTER INDEX {index_name}__staging RENAME TO {index_name}")
+                    conn.commit()
+                    timings['swap'] = round(time.monotonic() - step, 3)
+                except Exception as e:
+                    conn.rollback()
+                    conn.autocommit = True
+                    cursor.execute(f"DROP TABLE IF EXISTS {staging_table}")
+                    return {
+                        'success': False,
+                        'table_name': table_name,
+                        'error': f"Staged load failed, live table left unchanged: {e}"
+                    }
+                finally:
+                    cursor.close()
+                    conn.autocommit = True
+            
+            return {
+                'success': True,
+                'table_name': table_name,
+                'total_rows': load_result['total_rows'],
+                'imported_rows': load_result['imported_rows'],
+                'method': load_result['method'],
+                'indexes': indexes,
+                'timings': timings,
+                'elapsed_seconds': round(time.monotonic() - started, 3),
+                'message': f"Swapped in {load_result['imported_rows']} rows into {table_name}"
+            }
+        
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _get_checkpoint(self, cursor, filename: str, table_name: str) -> Optional[Tuple[int, int, str]]:
+        cursor.execute(
+            f"SELECT byte_offset, row_count, prefix_sha256 FROM {CHECKPOINT_TABLE} "
+            "WHERE filename = %s AND table_name = %s",
+            (filename, table_name)
+        )
+        return cursor.fetchone()
+
+    def _save_checkpoint(self, cursor, filename: str, table_name: str, byte_offset: int,
+                         row_count: int, prefix_sha256: str):
+        cursor.execute(
+            f"""INSERT INTO {CHECKPOINT_TABLE} (filename, table_name, byte_offset, row_count, prefix_sha256)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (filename, table_name) DO UPDATE SET
+                byte_offset = EXCLUDED.byte_offset,
+                row_count = EXCLUDED.row_count,
+                prefix_sha256 = EXCLUDED.prefix_sha256,
+                updated_at = CURRENT_TIMESTAMP""",
+            (filename, table_name, byte_offset, row_count, prefix_sha256)
+        )
+
+    def _upsert_dataframe(self, cursor, table_name: str, df: pd.DataFrame, upsert_key: str, method: str) -> Tuple[int, str]:
+        """Load a chunk into a temp table, then merge it on `upsert_key`"""
+        stage_table = f"_incremental_{table_name}"
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage_table} "
+            f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        # Rows get increasing ordinals in load order, so the last one per key wins
+        cursor.execute(f"ALTER TABLE {stage_table} ADD COLUMN IF NOT EXISTS _ordinal BIGSERIAL")
+        loaded, used_method = self.load_dataframe(cursor, stage_table, df, method)
+        columns = list(df.columns)
+        updates = ', '.join(f"{col} = EXCLUDED.{col}" for col in columns if col != upsert_key)
+        conflict_action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+        cursor.execute(
+            f"INSERT INTO {table_name} ({', '.join(columns)}) "
+            f"SELECT DISTINCT ON ({upsert_key}) {', '.join(columns)} FROM {stage_table} "
+            f"ORDER BY {upsert_key}, _ordinal DESC "
+            f"ON CONFLICT ({upsert_key}) {conflict_action}"
+        )
+        return loaded, used_method
+
+    def import_csv_incremental(self, filename: str, table_name: str = None, upsert_key: str = None,
+                               method: str = None, chunk_bytes: int = None,
+                               progress_callback: Optional[Callable[[int, float], None]] = None) -> Dict[str, Any]:
+        """Import only the part of a CSV not loaded yet, resuming from a checkpoint.
+
+        A checkpoint (byte offset, row count, sha256 of the imported prefix) is
+        written in the same transaction as each chunk, so after a crash the next
+        run resumes exactly where the last commit ended. If the file only grew,
+        just the new tail is loaded. If the prefix no longer matches, the file was
+        rewritten: the table is truncated and reloaded (or, with `upsert_key`,
+        every row is re-merged on that key).
+        
+        Like the byte-level helpers above, rows must not contain quoted newlines.
+        """
+        if not table_name:
+            table_name = filename.replace('.csv', '').lower()
+        method = method or self.config.IMPORT_METHOD
+        chunk_bytes = chunk_bytes or self.config.IMPORT_CHECKPOINT_BYTES
+        progress_callback = progress_callback or print_progress
+        filepath = os.path.join(self.data_folder, filename)
+        
+        try:
+            file_size = os.path.getsize(filepath)
+            header = pd.read_csv(filepath, nrows=0).columns
+            columns = [clean_column_name(col) for col in header]
+            if upsert_key and upsert_key not in columns:
+                return {'success': False, 'error': f"Upsert key '{upsert_key}' is not a column of {filename}"}
             
-            # Create table first
             create_result = self.create_table_from_csv(filename, table_name)
             if not create_result['success']:
                 return create_result
             
-            # Import data in batches
-            batch_size = 1000
-            total_imported = 0
+            setup_sql = CHECKPOINT_DDL
+            if upsert_key:
+                setup_sql += (f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_{upsert_key}_key "
+                              f"ON {table_name} ({upsert_key});")
+            setup_result = self.db_manager.execute_query(setup_sql)
+            if not setup_result['success']:
+                return setup_result
             
-            for i in range(0, len(df), batch_size):
-                batch = df.iloc[i:i+batch_size]
-                
-                # Generate INSERT SQL
-                columns = ', '.join(batch.columns)
-                placeholders = ', '.join(['%s'] * len(batch.columns))
-                insert_sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-                
-                # Convert batch to list of tuples
-                values = [tuple(row) for row in batch.values]
-                
-                # Execute batch insert
-                for row_values in values:
-                    result = self.db_manager.execute_query(insert_sql, row_values)
-                    if result['success']:
-                        total_imported += 1
+            with self.db_manager.borrow_connection() as conn:
+                conn.autocommit = False
+                cursor = conn.cursor()
+                try:
+                    checkpoint = self._get_checkpoint(cursor, filename, table_name)
+                    mode = 'resume'
+                    if checkpoint:
+                        offset, row_count, prefix_sha256 = checkpoint
+                        hasher = hash_file_prefix(filepath, offset) if offset <= file_size else None
+                        if hasher is None or hasher.hexdigest() != prefix_sha256:
+                            checkpoint = None
+                            mode = 'reload'
                     else:
-                        print(f"Error importing row: {result['error']}")
+                        mode = 'initial'
+                    
+                    if not checkpoint:
+                        if mode == 'reload' and not upsert_key:
+                            cursor.execute(f"TRUNCATE {table_name}")
+                        with open(filepath, 'rb') as f:
+                            offset = len(f.readline())
+                        row_count = 0
+                        hasher = hash_file_prefix(filepath, offset)
+                    
+                    start_offset, start_rows = offset, row_count
+                    started = time.monotonic()
+                    used_method = method
+                    
+                    with open(filepath, 'rb') as f:
+                        f.seek(offset)
+                        while True:
+                            lines = f.readlines(chunk_bytes)
+                            if not lines:
+                                break
+                            data = b"".join(lines)
+                            chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=str)
+                            if upsert_key:
+                                loaded, used_method = self._upsert_dataframe(cursor, table_name, chunk, upsert_key, used_method)
+                            else:
+                                loaded, used_method = self.load_dataframe(cursor, table_name, chunk, used_method)
+                            
+                            hasher.update(data)
+                            offset += len(data)
+                            row_count += loaded
+                            self._save_checkpoint(cursor, filename, table_name, offset, row_count, hasher.hexdigest())
+                            conn.commit()
+                            
+                            elapsed = max(time.monotonic() - started, 1e-9)
+                            progress_callback(row_count - start_rows, (row_count - start_rows) / elapsed)
+                    
+                    if offset == start_offset and mode != 'resume':
+                        # Empty file: still record that the header has been seen
+                        self._save_checkpoint(cursor, filename, table_name, offset, row_count, hasher.hexdigest())
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"Error importing rows: {e}")
+                    return {
+                        'success': False,
+                        'table_name': table_name,
+                        'error': str(e),
+                        'message': "Rows up to the last checkpoint were kept; re-run to resume"
+                    }
+                finally:
+                    cursor.close()
+                    conn.autocommit = True
             
+            new_rows = row_count - start_rows
             return {
                 'success': True,
                 'table_name': table_name,
-                'total_rows': len(df),
-                'imported_rows': total_imported,
-                'message': f"Successfully imported {total_imported} rows into {table_name}"
+                'mode': mode,
+                'start_offset': start_offset,
+                'byte_offset': offset,
+                'imported_rows': new_rows,
+                'total_rows': row_count,
+                'method': used_method,
+                'message': f"Imported {new_rows} new rows into {table_name} ({mode})"
+            }
+        
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
             }
+    
+    def import_all_csv(self, filenames: List[str] = None, max_workers: int = None,
+                       method: str = None, compact: bool = None) -> Dict[str, Any]:
+        """Import several CSV files in parallel, one worker process per file.
+
+        Each worker opens its own connection and COPY stream; at most
+        `max_workers` (default IMPORT_MAX_WORKERS) run at once.
+        """
+        filenames = filenames if filenames is not None else self.get_csv_files()
+        max_workers = max_workers or self.config.IMPORT_MAX_WORKERS
+        method = method or self.config.IMPORT_METHOD
+        started = time.monotonic()
+        
+        files = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_import_file_worker, self.data_folder, filename, method, compact): filename
+                for filename in filenames
+            }
+            for future in as_completed(futures):
+                try:
+                    files.append(future.result())
+                except Exception as e:
+                    files.append({'success': False, 'filename': futures[future], 'error': str(e)})
+        
+        files.sort(key=lambda r: filenames.index(r['filename']))
+        imported = sum(r.get('imported_rows', 0) for r in files if r['success'])
+        failed = [r['filename'] for r in files if not r['success']]
+        return {
+            'success': not failed,
+            'files': files,
+            'imported_rows': imported,
+            'failed_files': failed,
+            'elapsed_seconds': round(time.monotonic() - started, 3),
+            'message': f"Imported {imported} rows from {len(files) - len(failed)}/{len(files)} files"
+        }
+    
+    def import_csv_partitioned(self, filename: str, table_name: str = None, partitions: int = None,
+                               compact: bool = None) -> Dict[str, Any]:
+        """Import one large CSV by COPYing byte-range partitions in parallel.
+
+        Every partition commits independently, so a failed partition leaves the
+        others loaded; check `failed_partitions` in the result. Partitions that
+        failed because a compact column rejected a value are rerun once after
+        the compact columns are widened to their default types.
+        """
+        if not table_name:
+            table_name = filename.replace('.csv', '').lower()
+        partitions = partitions or self.config.IMPORT_MAX_WORKERS
+        filepath = os.path.join(self.data_folder, filename)
+        started = time.monotonic()
+        
+        try:
+            create_result = self.create_table_from_csv(filename, table_name, compact=compact)
+            if not create_result['success']:
+                return create_result
+            
+            header = pd.read_csv(filepath, nrows=0).columns
+            columns = [clean_column_name(col) for col in header]
+            ranges = partition_csv(filepath, partitions)
             
+            with ProcessPoolExecutor(max_workers=min(partitions, max(1, len(ranges)))) as executor:
+                results = list(executor.map(
+                    _copy_range_worker,
+                    [filepath] * len(ranges), [table_name] * len(ranges), [columns] * len(ranges),
+                    [start for start, _ in ranges], [end for _, end in ranges]
+                ))
+                
+                rejected = [i for i, r in enumerate(results) if r.get('pgcode') in COMPACT_TYPE_SQLSTATES]
+                if rejected:
+                    widen_result = self.widen_compact_columns(table_name, create_result['columns'])
+                    if widen_result['success'] and widen_result['widened']:
+                        retried = executor.map(
+                            _copy_range_worker,
+                            [filepath] * len(rejected), [table_name] * len(rejected), [columns] * len(rejected),
+                            [results[i]['start'] for i in rejected], [results[i]['end'] for i in rejected]
+                        )
+                        for i, result in zip(rejected, retried):
+                            results[i] = result
+            
+            imported = sum(r['imported_rows'] for r in results)
+            failed = [r for r in results if not r['success']]
+            return {
+                'success': not failed,
+                'table_name': table_name,
+                'partitions': results,
+                'imported_rows': imported,
+                'failed_partitions': len(failed),
+                'elapsed_seconds': round(time.monotonic() - started, 3),
+                'message': f"Imported {imported} rows into {table_name} from {len(ranges)} partitions",
+                **({'error': failed[0]['error']} if failed else {})
+            }
+        
         except Exception as e:
             return {
                 'success': False,
@@ -170,8 +1105,51 @@ class CSVImporter:
         """List all tables that were imported from CSV"""
         return self.db_manager.get_all_tables()
 
+def run_batch(args):
+    """Non-interactive batch import for scheduled jobs"""
+    importer = CSVImporter()
+    
+    if args.staged:
+        print(f"🚀 Staged reload of {args.staged}...")
+        result = importer.import_csv_staged(args.staged, args.table, index_columns=args.index)
+    elif args.incremental:
+        print(f"🚀 Incrementally importing {args.incremental}...")
+        result = importer.import_csv_incremental(args.incremental, args.table, upsert_key=args.key)
+    elif args.partitioned:
+        print(f"🚀 Importing {args.partitioned} in {args.workers or importer.config.IMPORT_MAX_WORKERS} partitions...")
+        result = importer.import_csv_partitioned(args.partitioned, args.table, partitions=args.workers)
+        for part in result.get('partitions', []):
+            status = "✅" if part['success'] else f"❌ {part.get('error')}"
+            print(f"  bytes {part['start']:,}-{part['end']:,}: {part['imported_rows']:,} rows {status}")
+    else:
+        print("🚀 Importing all CSV files...")
+        result = importer.import_all_csv(max_workers=args.workers)
+        for file_result in result.get('files', []):
+            if file_result['success']:
+                print(f"  ✅ {file_result['filename']}: {file_result['imported_rows']:,} rows "
+                      f"in {file_result['elapsed_seconds']}s")
+            else:
+                print(f"  ❌ {file_result['filename']}: {file_result['error']}")
+    
+    print(("✅ " if result['success'] else "⚠️ ") + result.get('message', result.get('error', '')))
+    return result['success']
+
 def main():
     """Interactive CSV importer"""
+    parser = argparse.ArgumentParser(description="CSV to PostgreSQL Importer")
+    parser.add_argument("--all", action="store_true", help="import every CSV in data/ in parallel")
+    parser.add_argument("--partitioned", metavar="FILE", help="import one CSV in parallel byte-range partitions")
+    parser.add_argument("--incremental", metavar="FILE", help="import only rows added since the last checkpoint")
+    parser.add_argument("--key", help="upsert key column for --incremental")
+    parser.add_argument("--staged", metavar="FILE", help="reload a table via staging table and atomic swap")
+    parser.add_argument("--index", action="append", help="column to index after a --staged load (repeatable)")
+    parser.add_argument("--table", help="target table for --partitioned / --incremental / --staged")
+    parser.add_argument("--workers", type=int, help="max concurrent workers (default: IMPORT_MAX_WORKERS)")
+    args = parser.parse_args()
+    
+    if args.all or args.partitioned or args.incremental or args.staged:
+        sys.exit(0 if run_batch(args) else 1)
+    
     importer = CSVImporter()
     
     print("🗃️ CSV to PostgreSQL Importer")
@@ -206,6 +1184,11 @@ def main():
         for col in analysis['columns']:
             print(f"  - {col['name']}: {col['type']}")
         
+        estimate = analysis.get('storage_estimate')
+        if estimate:
+            print(f"💾 Compact types save ~{estimate['saved_bytes'] / 1024 ** 2:.1f} MB "
+                  f"({estimate['default_bytes'] / 1024 ** 2:.1f} MB -> {estimate['compact_bytes'] / 1024 ** 2:.1f} MB)")
+        
         # Ask for table name
         default_table = selected_file.replace('.csv', '').lower()
         table_name = input(f"\nTable name (default: {default_table}): ").strip()
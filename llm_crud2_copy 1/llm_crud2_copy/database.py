@@ -1,15 +1,244 @@
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 import psycopg2
+from psycopg2 import extensions
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple, Iterator, Union
 from config import Config
 
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the timeout"""
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with health checks and recycling"""
+
+    def __init__(self, connect_kwargs: Dict[str, Any], min_size: int = 1, max_size: int = 10,
+                 timeout: float = 30.0, max_lifetime: float = 1800.0):
+        self.connect_kwargs = connect_kwargs
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+
+        self._idle: List[Tuple[Any, float]] = []
+        self._created_at: Dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _new_connection(self):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        conn.autocommit = True
+        return conn
+
+    def fill(self):
+        """Open connections until the pool holds at least min_size"""
+        with self._condition:
+            needed = max(0, self.min_size - self._size)
+            # Reserve the slots so concurrent fills do not overshoot
+            self._size += needed
+
+        # Connect with the lock released; a slow server must not block checkouts
+        for opened in range(needed):
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._condition:
+                    self._size -= needed - opened
+                    self._condition.notify_all()
+                raise
+            with self._condition:
+                self._created_at[id(conn)] = time.monotonic()
+                self._idle.append((conn, time.monotonic()))
+                self._condition.notify()
+
+    def _is_expired(self, conn) -> bool:
+        created = self._created_at.get(id(conn), 0.0)
+        return self.max_lifetime > 0 and time.monotonic() - created > self.max_lifetime
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _forget(self, conn):
+        """Drop a connection from the pool's accounting; caller holds the lock"""
+        self._created_at.pop(id(conn), None)
+        self._size -= 1
+        self._condition.notify()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Check out a healthy connection, waiting at most `timeout` seconds.
+
+        The lock only guards the pool's bookkeeping; health checks and new
+        connections happen outside it, so one slow backend cannot stall
+        every other checkout and return.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            conn = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    if self._idle:
+                        conn, _ = self._idle.pop()
+                        expired = self._is_expired(conn)
+                        break
+                    if self._size < self.max_size:
+                        # Reserve the slot before releasing the lock to connect
+                        self._size += 1
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection"
+                        )
+                    self._condition.wait(remaining)
+
+            if conn is not None:
+                if not expired and self._is_healthy(conn):
+                    return conn
+                with self._condition:
+                    self._forget(conn)
+                self._close_quietly(conn)
+                continue
+
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+
+            with self._condition:
+                self._created_at[id(conn)] = time.monotonic()
+            return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection to the pool, dropping it if broken or expired"""
+        # Reset the session before taking the lock; rollback is a round trip
+        try:
+            if not discard and not conn.closed:
+                status = conn.get_transaction_status()
+                if status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not conn.autocommit:
+                    conn.autocommit = True
+        except Exception:
+            discard = True
+
+        with self._condition:
+            discard = discard or conn.closed or self._closed or self._is_expired(conn)
+            if discard:
+                self._forget(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+                self._condition.notify()
+        if discard:
+            self._close_quietly(conn)
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            for conn in idle:
+                self._forget(conn)
+            self._condition.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size
+            }
+
+_shared_pools: Dict[Tuple, ConnectionPool] = {}
+_shared_pools_lock = threading.Lock()
+
+def get_shared_pool(config: Optional[Config] = None) -> ConnectionPool:
+    """Return the process-wide pool for the configured database, creating it once"""
+    config = config or Config()
+    key = (config.DB_HOST, config.DB_PORT, config.DB_NAME, config.DB_USER)
+
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(
+                connect_kwargs={
+                    "host": config.DB_HOST,
+                    "port": config.DB_PORT,
+                    "database": config.DB_NAME,
+                    "user": config.DB_USER,
+                    "password": config.DB_PASSWORD
+                },
+                min_size=config.DB_POOL_MIN_SIZE,
+                max_size=config.DB_POOL_MAX_SIZE,
+                timeout=config.DB_POOL_TIMEOUT,
+                max_lifetime=config.DB_POOL_MAX_LIFETIME
+            )
+            _shared_pools[key] = pool
+        return pool
+
+# Statements that change the catalog; seeing one bumps the schema generation
+DDL_PATTERN = re.compile(r'^\s*(?:CREATE|ALTER|DROP|COMMENT)\b', re.IGNORECASE | re.MULTILINE)
+
+_schema_generations: Dict[Tuple, int] = {}
+_schema_generations_lock = threading.Lock()
+
+def database_key(config: Config) -> Tuple:
+    return (config.DB_HOST, config.DB_PORT, config.DB_NAME)
+
+def schema_generation(config: Config) -> int:
+    """Counter bumped whenever DDL runs through a DatabaseManager in this process"""
+    return _schema_generations.get(database_key(config), 0)
+
+def bump_schema_generation(config: Config):
+    key = database_key(config)
+    with _schema_generations_lock:
+        _schema_generations[key] = _schema_generations.get(key, 0) + 1
+
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, use_pool: Optional[bool] = None):
         self.config = Config()
         self.connection = None
-        
+        self.use_pool = self.config.DB_POOL_ENABLED if use_pool is None else use_pool
+        self.pool = get_shared_pool(self.config) if self.use_pool else None
+
     def connect(self):
         try:
+            if self.pool:
+                self.pool.fill()
+                return True
+
             self.connection = psycopg2.connect(
                 host=self.config.DB_HOST,
                 port=self.config.DB_PORT,
@@ -22,35 +251,129 @@ class DatabaseManager:
         except Exception as e:
             print(f"Database connection error: {e}")
             return False
-    
+
     def disconnect(self):
+        # The shared pool outlives any single manager, so only close our own connection
         if self.connection:
             self.connection.close()
-    
+            self.connection = None
+
+    @contextmanager
+    def borrow_connection(self):
+        """Yield a connection from the pool, or the manager's own connection"""
+        if self.pool:
+            conn = self.pool.getconn()
+            broken = False
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True
+                raise
+            finally:
+                self.pool.putconn(conn, discard=broken)
+        else:
+            if not self.connection or self.connection.closed:
+                if not self.connect():
+                    raise psycopg2.OperationalError("Failed to connect to database")
+            yield self.connection
+
     def execute_query(self, query: str, params: Optional[tuple] = None) -> Dict[str, Any]:
-        if not self.connection:
-            if not self.connect():
-                return {"success": False, "error": "Failed to connect to database"}
-        
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            
-            if query.strip().upper().startswith(('SELECT', 'WITH')):
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                df = pd.DataFrame(rows, columns=columns)
-                return {"success": True, "data": df, "rows_affected": len(rows)}
-            else:
-                rows_affected = cursor.rowcount
-                return {"success": True, "rows_affected": rows_affected}
-                
+            with self.borrow_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query, params)
+
+                    # SELECT ... INTO returns no result set
+                    if query.strip().upper().startswith(('SELECT', 'WITH')) and cursor.description is not None:
+                        columns = [desc[0] for desc in cursor.description]
+                        rows = cursor.fetchall()
+                        df = pd.DataFrame(rows, columns=columns)
+                        return {"success": True, "data": df, "rows_affected": len(rows)}
+                    else:
+                        rows_affected = cursor.rowcount
+                        if DDL_PATTERN.search(query):
+                            bump_schema_generation(self.config)
+                        return {"success": True, "rows_affected": rows_affected}
+                finally:
+                    cursor.close()
+
+        except PoolTimeoutError as e:
+            return {"success": False, "error": f"Failed to connect to database: {e}"}
         except Exception as e:
             return {"success": False, "error": str(e)}
-        finally:
-            if cursor:
-                cursor.close()
-    
+
+    def iter_query(self, query: str, params: Optional[tuple] = None, chunk_size: Optional[int] = None,
+                   as_dataframe: bool = True) -> Iterator[Union[pd.DataFrame, List[tuple]]]:
+        """Stream a SELECT through a server-side cursor, yielding one chunk at a time.
+
+        Only `chunk_size` rows are held in memory at once. Closing the generator
+        early (break, `.close()`) releases the cursor and the connection. An
+        empty result yields one empty DataFrame so the column names still arrive.
+        """
+        if not query.strip().upper().startswith(('SELECT', 'WITH')):
+            raise ValueError("iter_query only supports SELECT/WITH statements")
+
+        chunk_size = chunk_size or self.config.DB_FETCH_SIZE
+
+        with self.borrow_connection() as conn:
+            # Named cursors only live inside a transaction
+            previous_autocommit = conn.autocommit
+            conn.autocommit = False
+            cursor = conn.cursor(name=f"iter_{uuid.uuid4().hex}")
+            cursor.itersize = chunk_size
+            try:
+                cursor.execute(query, params)
+                columns = None
+                yielded = False
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if columns is None and cursor.description:
+                        columns = [desc[0] for desc in cursor.description]
+                    if not rows:
+                        if as_dataframe and not yielded:
+                            yield pd.DataFrame([], columns=columns)
+                        break
+                    yielded = True
+                    if as_dataframe:
+                        yield pd.DataFrame(rows, columns=columns)
+                    else:
+                        yield rows
+            finally:
+                try:
+                    cursor.close()
+                    conn.rollback()
+                    conn.autocommit = previous_autocommit
+                except psycopg2.Error:
+                    pass
+
+    def execute_query_chunked(self, query: str, params: Optional[tuple] = None,
+                              chunk_size: Optional[int] = None, max_rows: Optional[int] = None) -> Dict[str, Any]:
+        """Run a SELECT via iter_query, stopping after `max_rows` rows"""
+        try:
+            chunks = []
+            total = 0
+            truncated = False
+            stream = self.iter_query(query, params, chunk_size=chunk_size)
+            try:
+                for chunk in stream:
+                    if max_rows is not None and total + len(chunk) > max_rows:
+                        chunk = chunk.iloc[:max_rows - total]
+                        truncated = True
+                    chunks.append(chunk)
+                    total += len(chunk)
+                    if truncated:
+                        break
+            finally:
+                stream.close()
+
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            return {"success": True, "data": df, "rows_affected": total, "truncated": truncated}
+        except PoolTimeoutError as e:
+            return {"success": False, "error": f"Failed to connect to database: {e}"}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
     def get_table_schema(self, table_name: str) -> Dict[str, Any]:
         query = """
         SELECT column_name, data_type, is_nullable, column_default
@@ -59,7 +382,7 @@ class DatabaseManager:
         ORDER BY ordinal_position;
         """
         return self.execute_query(query, (table_name,))
-    
+
     def get_all_tables(self) -> Dict[str, Any]:
         query = """
         SELECT table_name
@@ -68,10 +391,94 @@ class DatabaseManager:
         ORDER BY table_name;
         """
         return self.execute_query(query)
-    
+
+    def get_foreign_keys(self) -> List[Tuple[str, str, str, str]]:
+        """(table, column, referenced_table, referenced_column) for every FK in public"""
+        query = """
+        SELECT kcu.table_name, kcu.column_name, ccu.table_name AS ref_table, ccu.column_name AS ref_column
+        FROM information_schema.table_constraints tc
+        JOIN information_schema.key_column_usage kcu
+          ON tc.constraint_name = kcu.constraint_name AND tc.table_schema = kcu.table_schema
+        JOIN information_schema.constraint_column_usage ccu
+          ON tc.constraint_name = ccu.constraint_name AND tc.table_schema = ccu.table_schema
+        WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_schema = 'public';
+        """
+        result = self.execute_query(query)
+        if not result["success"]:
+            return []
+        return [tuple(row) for row in result["data"].itertuples(index=False)]
+
+    def get_catalog_columns(self) -> Dict[str, Any]:
+        """Every public table's columns in one query (table_name, column_name, data_type, ...)"""
+        query = """
+        SELECT c.table_name, c.column_name, c.data_type, c.is_nullable, c.column_default
+        FROM information_schema.columns c
+        JOIN information_schema.tables t
+          ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+        WHERE c.table_schema = 'public'
+        ORDER BY c.table_name, c.ordinal_position;
+        """
+        return self.execute_query(query)
+
+    def get_volatile_functions(self, names: List[str]) -> Optional[Set[str]]:
+        """Which of `names` are volatile functions outside pg_catalog (so may write); None on error"""
+        query = """
+        SELECT DISTINCT p.proname
+        FROM pg_proc p
+        JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE p.proname = ANY(%s) AND p.provolatile = 'v' AND n.nspname <> 'pg_catalog';
+        """
+        result = self.execute_query(query, (list(names),))
+        if not result["success"]:
+            return None
+        return set(result["data"]["proname"])
+
+    def get_catalog_version(self) -> Optional[str]:
+        """Cheap token that changes whenever a public table or column is created, altered or dropped.
+
+        DDL writes new pg_class/pg_attribute row versions, so their row count and
+        newest xmin move; ANALYZE/VACUUM update those rows in place and do not.
+        """
+        query = """
+        SELECT count(*)::text || ':' || COALESCE(max(c.xmin::text::bigint), 0)::text
+               || ':' || COALESCE(max(a.xmin::text::bigint), 0)::text AS version
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+        WHERE n.nspname = 'public' AND c.relkind IN ('r', 'v', 'm', 'p', 'f');
+        """
+        result = self.execute_query(query)
+        if not result["success"] or result["data"].empty:
+            return None
+        return result["data"]["version"].iloc[0]
+
+    def get_categorical_values(self, max_distinct: int = 20) -> List[str]:
+        """Distinct values of low-cardinality text columns and ENUM labels.
+
+        Uses planner statistics (pg_stats), so it costs one catalog query and
+        only sees tables that have been ANALYZEd.
+        """
+        query = """
+        SELECT DISTINCT value FROM (
+            SELECT unnest(s.most_common_vals::text::text[]) AS value
+            FROM pg_stats s
+            JOIN information_schema.columns c
+              ON c.table_schema = s.schemaname AND c.table_name = s.tablename AND c.column_name = s.attname
+            WHERE s.schemaname = 'public' AND s.n_distinct > 0 AND s.n_distinct <= %s
+              AND c.data_type IN ('character varying', 'text', 'character', 'USER-DEFINED')
+            UNION
+            SELECT enumlabel FROM pg_enum
+        ) v
+        ORDER BY value;
+        """
+        result = self.execute_query(query, (max_distinct,))
+        if not result["success"]:
+            return []
+        return result["data"]["value"].tolist()
+
     def test_connection(self) -> bool:
         try:
             result = self.execute_query("SELECT 1 as test")
             return result["success"]
         except:
-            return False
\ No newline at end of file
+            return False
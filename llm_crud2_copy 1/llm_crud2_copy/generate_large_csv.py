@@ -1,130 +1,265 @@
-import csv
-import random
-from datetime import datetime, timedelta
+import argparse
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+import numpy as np
+import pandas as pd
 from faker import Faker
 
-def generate_large_customer_csv(filename: str, num_records: int = 5000):
-    """Generate a large CSV file with customer data"""
+# Rows per shard. Shards are seeded by index, so the output for a given seed
+# does not depend on how many worker processes generate them.
+SHARD_ROWS = 200_000
+
+# Faker is slow per call; draw this many values once and index into them
+FAKER_POOL_SIZE = 2000
+
+# Fixed "today" so a seed always produces byte-identical files
+DEFAULT_END_DATE = "2025-01-01"
+
+OCCUPATIONS = [
+    'Software Engineer', 'Data Scientist', 'Product Manager', 'Marketing Manager',
+    'Sales Director', 'UX Designer', 'DevOps Engineer', 'Business Analyst',
+    'Full Stack Developer', 'Backend Developer', 'Frontend Developer',
+    'Database Administrator', 'Project Manager', 'Technical Lead',
+    'Cloud Architect', 'Mobile Developer', 'QA Engineer', 'Product Owner'
+]
+
+STATES = [
+    'NY', 'CA', 'TX', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI',
+    'NJ', 'VA', 'WA', 'AZ', 'MA', 'TN', 'IN', 'MO', 'MD', 'WI'
+]
+
+PRODUCTS = [
+    'Laptop', 'Desktop Computer', 'Monitor', 'Keyboard', 'Mouse',
+    'Tablet', 'Smartphone', 'Headphones', 'Webcam', 'Printer',
+    'Router', 'Hard Drive', 'SSD', 'RAM', 'Graphics Card',
+    'Motherboard', 'CPU', 'Power Supply', 'Case', 'Cooling Fan'
+]
+
+CATEGORIES = ['Electronics', 'Computers', 'Accessories', 'Components']
+
+PAYMENT_METHODS = ['Credit Card', 'Debit Card', 'PayPal', 'Cash']
+
+# Category frequencies observed in data/studentperformancefactor.csv
+# ('' is a missing value, as in the source file)
+STUDENT_CATEGORIES = {
+    'Parental_Involvement': {'Medium': 0.509, 'High': 0.289, 'Low': 0.202},
+    'Access_to_Resources': {'Medium': 0.502, 'High': 0.299, 'Low': 0.199},
+    'Extracurricular_Activities': {'Yes': 0.596, 'No': 0.404},
+    'Motivation_Level': {'Medium': 0.507, 'Low': 0.293, 'High': 0.200},
+    'Internet_Access': {'Yes': 0.924, 'No': 0.076},
+    'Family_Income': {'Low': 0.404, 'Medium': 0.404, 'High': 0.192},
+    'Teacher_Quality': {'Medium': 0.594, 'High': 0.295, 'Low': 0.099, '': 0.012},
+    'School_Type': {'Public': 0.696, 'Private': 0.304},
+    'Peer_Influence': {'Positive': 0.399, 'Neutral': 0.392, 'Negative': 0.209},
+    'Learning_Disabilities': {'No': 0.895, 'Yes': 0.105},
+    'Parental_Education_Level': {'High School': 0.488, 'College': 0.301, 'Postgraduate': 0.197, '': 0.014},
+    'Distance_from_Home': {'Near': 0.588, 'Moderate': 0.302, 'Far': 0.100, '': 0.010},
+    'Gender': {'Male': 0.577, 'Female': 0.423},
+}
+
+STUDENT_COLUMNS = [
+    'Hours_Studied', 'Attendance', 'Parental_Involvement', 'Access_to_Resources',
+    'Extracurricular_Activities', 'Sleep_Hours', 'Previous_Scores', 'Motivation_Level',
+    'Internet_Access', 'Tutoring_Sessions', 'Family_Income', 'Teacher_Quality',
+    'School_Type', 'Peer_Influence', 'Physical_Activity', 'Learning_Disabilities',
+    'Parental_Education_Level', 'Distance_from_Home', 'Gender', 'Exam_Score'
+]
+
+def build_faker_pools(seed: int, fields: List[str], size: int = FAKER_POOL_SIZE) -> Dict[str, np.ndarray]:
+    """Pre-sample Faker values so rows can be generated by array indexing"""
     fake = Faker()
-    
-    # Define data for random selection
-    occupations = [
-        'Software Engineer', 'Data Scientist', 'Product Manager', 'Marketing Manager',
-        'Sales Director', 'UX Designer', 'DevOps Engineer', 'Business Analyst',
-        'Full Stack Developer', 'Backend Developer', 'Frontend Developer',
-        'Database Administrator', 'Project Manager', 'Technical Lead',
-        'Cloud Architect', 'Mobile Developer', 'QA Engineer', 'Product Owner'
-    ]
-    
-    states = [
-        'NY', 'CA', 'TX', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI',
-        'NJ', 'VA', 'WA', 'AZ', 'MA', 'TN', 'IN', 'MO', 'MD', 'WI'
-    ]
-    
-    print(f"🔄 Generating {num_records:,} customer records...")
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = [
-            'id', 'first_name', 'last_name', 'email', 'phone', 'address',
-            'city', 'state', 'zip_code', 'country', 'registration_date',
-            'age', 'gender', 'occupation', 'salary'
-        ]
-        
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for i in range(1, num_records + 1):
-            # Generate random data
-            first_name = fake.first_name()
-            last_name = fake.last_name()
-            email = f"{first_name.lower()}.{last_name.lower()}@{fake.domain_name()}"
-            
-            # Random registration date in last 2 years
-            start_date = datetime.now() - timedelta(days=730)
-            random_date = start_date + timedelta(days=random.randint(0, 730))
-            
-            record = {
-                'id': i,
-                'first_name': first_name,
-                'last_name': last_name,
-                'email': email,
-                'phone': fake.phone_number(),
-                'address': fake.street_address(),
-                'city': fake.city(),
-                'state': random.choice(states),
-                'zip_code': fake.zipcode(),
-                'country': 'USA',
-                'registration_date': random_date.strftime('%Y-%m-%d'),
-                'age': random.randint(22, 65),
-                'gender': random.choice(['M', 'F']),
-                'occupation': random.choice(occupations),
-                'salary': random.randint(45000, 150000)
-            }
-            
-            writer.writerow(record)
-            
-            # Progress indicator
-            if i % 1000 == 0:
-                print(f"  Generated {i:,} records...")
-    
+    fake.seed_instance(seed)
+    return {field: np.array([getattr(fake, field)() for _ in range(size)], dtype=object) for field in fields}
+
+def _choice(rng: np.random.Generator, options: Dict[str, float], n: int) -> np.ndarray:
+    labels = np.array(list(options.keys()), dtype=object)
+    probs = np.array(list(options.values()))
+    return labels[rng.choice(len(labels), size=n, p=probs / probs.sum())]
+
+def _pick(rng: np.random.Generator, pool: np.ndarray, n: int) -> np.ndarray:
+    return pool[rng.integers(0, len(pool), size=n)]
+
+def customer_frame(rng: np.random.Generator, start_id: int, n: int, pools: Dict[str, np.ndarray],
+                   end_date: str = DEFAULT_END_DATE) -> pd.DataFrame:
+    """Vectorized customer rows (same columns as the original generator)"""
+    first_name = pd.Series(_pick(rng, pools['first_name'], n))
+    last_name = pd.Series(_pick(rng, pools['last_name'], n))
+    domain = pd.Series(_pick(rng, pools['domain_name'], n))
+    end = np.datetime64(end_date, 'D')
+    registration = end - np.timedelta64(730, 'D') + rng.integers(0, 731, size=n).astype('timedelta64[D]')
+
+    return pd.DataFrame({
+        'id': np.arange(start_id, start_id + n),
+        'first_name': first_name,
+        'last_name': last_name,
+        'email': first_name.str.lower() + '.' + last_name.str.lower() + '@' + domain,
+        'phone': _pick(rng, pools['phone_number'], n),
+        'address': _pick(rng, pools['street_address'], n),
+        'city': _pick(rng, pools['city'], n),
+        'state': _pick(rng, np.array(STATES, dtype=object), n),
+        'zip_code': _pick(rng, pools['zipcode'], n),
+        'country': 'USA',
+        'registration_date': pd.Series(registration).dt.strftime('%Y-%m-%d'),
+        'age': rng.integers(22, 66, size=n),
+        'gender': _pick(rng, np.array(['M', 'F'], dtype=object), n),
+        'occupation': _pick(rng, np.array(OCCUPATIONS, dtype=object), n),
+        'salary': rng.integers(45000, 150001, size=n)
+    })
+
+def sales_frame(rng: np.random.Generator, start_id: int, n: int, pools: Dict[str, np.ndarray],
+                end_date: str = DEFAULT_END_DATE) -> pd.DataFrame:
+    """Vectorized sales transaction rows (same columns as the original generator)"""
+    quantity = rng.integers(1, 6, size=n)
+    unit_price = np.round(rng.uniform(29.99, 2999.99, size=n), 2)
+    discount = np.round(rng.uniform(0, 0.2, size=n), 2)
+    end = np.datetime64(end_date, 's')
+    transaction_date = end - np.timedelta64(365 * 86400, 's') + rng.integers(0, 365 * 86400, size=n).astype('timedelta64[s]')
+    ids = pd.Series(np.arange(start_id, start_id + n))
+
+    return pd.DataFrame({
+        'transaction_id': 'TXN' + ids.astype(str).str.zfill(6),
+        'customer_id': rng.integers(1, 5001, size=n),  # Reference to customers
+        'product_name': _pick(rng, np.array(PRODUCTS, dtype=object), n),
+        'category': _pick(rng, np.array(CATEGORIES, dtype=object), n),
+        'quantity': quantity,
+        'unit_price': unit_price,
+        'total_amount': np.round(quantity * unit_price * (1 - discount), 2),
+        'discount': discount,
+        'transaction_date': pd.Series(transaction_date).dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'payment_method': _pick(rng, np.array(PAYMENT_METHODS, dtype=object), n),
+        'sales_rep': _pick(rng, pools['name'], n)
+    })
+
+def student_frame(rng: np.random.Generator, start_id: int, n: int, pools: Dict[str, np.ndarray],
+                  end_date: str = DEFAULT_END_DATE) -> pd.DataFrame:
+    """Rows shaped like studentperformancefactor.csv, with matching ranges and category mix"""
+    hours = np.clip(np.rint(rng.normal(20, 6, size=n)), 1, 44).astype(int)
+    attendance = rng.integers(60, 101, size=n)
+    sleep = np.clip(np.rint(rng.normal(7, 1.5, size=n)), 4, 10).astype(int)
+    previous = rng.integers(50, 101, size=n)
+    tutoring = np.clip(rng.poisson(1.5, size=n), 0, 8)
+    activity = np.clip(np.rint(rng.normal(3, 1, size=n)), 0, 6).astype(int)
+
+    frame = {
+        'Hours_Studied': hours,
+        'Attendance': attendance,
+        'Sleep_Hours': sleep,
+        'Previous_Scores': previous,
+        'Tutoring_Sessions': tutoring,
+        'Physical_Activity': activity,
+    }
+    for column, options in STUDENT_CATEGORIES.items():
+        frame[column] = _choice(rng, options, n)
+
+    # Exam score tracks study time and attendance like the source data
+    score = (40 + 0.3 * hours + 0.2 * attendance + 0.5 * tutoring
+             + 0.05 * previous + rng.normal(0, 2, size=n))
+    frame['Exam_Score'] = np.clip(np.rint(score), 55, 101).astype(int)
+
+    return pd.DataFrame(frame)[STUDENT_COLUMNS]
+
+GENERATORS: Dict[str, Dict] = {
+    'customers': {
+        'frame': customer_frame,
+        'pools': ['first_name', 'last_name', 'domain_name', 'phone_number',
+                  'street_address', 'city', 'zipcode'],
+        'label': 'customer'
+    },
+    'sales': {'frame': sales_frame, 'pools': ['name'], 'label': 'sales'},
+    'students': {'frame': student_frame, 'pools': [], 'label': 'student'},
+}
+
+def _write_shard(kind: str, seed: int, shard: int, start_id: int, n: int, pools: Dict[str, np.ndarray],
+                 end_date: str, path: str, header: bool) -> int:
+    """Process-pool entry point: generate one shard and write it to its own file"""
+    rng = np.random.default_rng([seed, shard])
+    df = GENERATORS[kind]['frame'](rng, start_id, n, pools, end_date)
+    df.to_csv(path, index=False, header=header)
+    return n
+
+def rows_for_target_size(kind: str, target_gb: float, seed: int = 42, sample_rows: int = 2000) -> int:
+    """Estimate how many rows fill `target_gb` by measuring a generated sample"""
+    pools = build_faker_pools(seed, GENERATORS[kind]['pools'])
+    rng = np.random.default_rng(seed)
+    sample = GENERATORS[kind]['frame'](rng, 1, sample_rows, pools, DEFAULT_END_DATE)
+    bytes_per_row = len(sample.to_csv(index=False, header=False).encode('utf-8')) / sample_rows
+    return max(1, int(target_gb * 1024 ** 3 / bytes_per_row))
+
+def generate_csv(kind: str, filename: str, num_records: int = None, target_gb: float = None,
+                 seed: int = 42, workers: int = None, end_date: str = DEFAULT_END_DATE) -> int:
+    """Generate `num_records` rows (or about `target_gb` of CSV) across worker processes.
+
+    The same seed and end_date always produce the same file, whatever the
+    number of workers.
+    """
+    if num_records is None:
+        if target_gb is None:
+            raise ValueError("Pass num_records or target_gb")
+        num_records = rows_for_target_size(kind, target_gb, seed)
+
+    label = GENERATORS[kind]['label']
+    print(f"🔄 Generating {num_records:,} {label} records...")
+
+    pools = build_faker_pools(seed, GENERATORS[kind]['pools'])
+    shards = [(i, start, min(SHARD_ROWS, num_records - start))
+              for i, start in enumerate(range(0, num_records, SHARD_ROWS))]
+
+    tmp_dir = tempfile.mkdtemp(prefix="gen_csv_", dir=os.path.dirname(os.path.abspath(filename)))
+    try:
+        paths = [os.path.join(tmp_dir, f"part_{i:05d}.csv") for i, _, _ in shards]
+        generated = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_write_shard, kind, seed, i, start + 1, n, pools, end_date, path, i == 0)
+                for (i, start, n), path in zip(shards, paths)
+            ]
+            for future in futures:
+                generated += future.result()
+                print(f"  Generated {generated:,} records...")
+
+        with open(filename, 'wb') as out:
+            for path in paths:
+                with open(path, 'rb') as part:
+                    shutil.copyfileobj(part, out, 1 << 22)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
     print(f"✅ Successfully generated {filename} with {num_records:,} records")
+    return num_records
+
+def generate_large_customer_csv(filename: str, num_records: int = 5000, seed: int = 42, workers: int = None):
+    """Generate a large CSV file with customer data"""
+    return generate_csv('customers', filename, num_records, seed=seed, workers=workers)
 
-def generate_sales_csv(filename: str, num_records: int = 10000):
+def generate_sales_csv(filename: str, num_records: int = 10000, seed: int = 42, workers: int = None):
     """Generate sales transaction data"""
-    fake = Faker()
-    
-    products = [
-        'Laptop', 'Desktop Computer', 'Monitor', 'Keyboard', 'Mouse',
-        'Tablet', 'Smartphone', 'Headphones', 'Webcam', 'Printer',
-        'Router', 'Hard Drive', 'SSD', 'RAM', 'Graphics Card',
-        'Motherboard', 'CPU', 'Power Supply', 'Case', 'Cooling Fan'
-    ]
-    
-    categories = ['Electronics', 'Computers', 'Accessories', 'Components']
-    
-    print(f"🔄 Generating {num_records:,} sales records...")
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = [
-            'transaction_id', 'customer_id', 'product_name', 'category',
-            'quantity', 'unit_price', 'total_amount', 'discount',
-            'transaction_date', 'payment_method', 'sales_rep'
-        ]
-        
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for i in range(1, num_records + 1):
-            quantity = random.randint(1, 5)
-            unit_price = round(random.uniform(29.99, 2999.99), 2)
-            discount = round(random.uniform(0, 0.2), 2)
-            total_amount = round(quantity * unit_price * (1 - discount), 2)
-            
-            # Random transaction date in last year
-            start_date = datetime.now() - timedelta(days=365)
-            random_date = start_date + timedelta(days=random.randint(0, 365))
-            
-            record = {
-                'transaction_id': f"TXN{i:06d}",
-                'customer_id': random.randint(1, 5000),  # Reference to customers
-                'product_name': random.choice(products),
-                'category': random.choice(categories),
-                'quantity': quantity,
-                'unit_price': unit_price,
-                'total_amount': total_amount,
-                'discount': discount,
-                'transaction_date': random_date.strftime('%Y-%m-%d %H:%M:%S'),
-                'payment_method': random.choice(['Credit Card', 'Debit Card', 'PayPal', 'Cash']),
-                'sales_rep': fake.name()
-            }
-            
-            writer.writerow(record)
-            
-            if i % 2000 == 0:
-                print(f"  Generated {i:,} records...")
-    
-    print(f"✅ Successfully generated {filename} with {num_records:,} records")
+    return generate_csv('sales', filename, num_records, seed=seed, workers=workers)
+
+def generate_student_csv(filename: str, num_records: int = 6607, seed: int = 42, workers: int = None):
+    """Generate student performance data shaped like studentperformancefactor.csv"""
+    return generate_csv('students', filename, num_records, seed=seed, workers=workers)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic CSV data for load testing")
+    parser.add_argument("kind", choices=sorted(GENERATORS))
+    parser.add_argument("output", help="CSV file to write, e.g. data/students_10m.csv")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--rows", type=int, help="number of rows")
+    size.add_argument("--gb", type=float, help="approximate output size in GB")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--end-date", default=DEFAULT_END_DATE, help="latest generated date (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    generate_csv(args.kind, args.output, num_records=args.rows, target_gb=args.gb,
+                 seed=args.seed, workers=args.workers, end_date=args.end_date)
+
+if __name__ == "__main__":
+    main()
 
 # This file is for generating sample data if needed
 # Since you have your own CSV file, you can ignore this file
-# Use csv_importer.py to import your existing CSV file
\ No newline at end of file
+# Use csv_importer.py to import your existing CSV file
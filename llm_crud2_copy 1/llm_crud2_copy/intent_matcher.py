@@ -0,0 +1,120 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'fifteen': 15, 'twenty': 20, 'fifty': 50, 'hundred': 100
+}
+
+# Each pattern must cover the whole question; `table` is checked against the catalog
+_ROWS = r'(?:rows|records|entries|data|everything)'
+_SHOW = r'(?:show|list|display|get|fetch|return|select|give|view|see)(?:\s+me)?'
+_IN = r'(?:from|in|of|inside)'
+_TABLE = r'(?:the\s+)?(?P<table>[a-z0-9_ ]+?)(?:\s+table)?'
+_N = r'(?P<n>\d+|' + '|'.join(NUMBER_WORDS) + r')'
+
+INTENT_PATTERNS = [
+    ('first_n', re.compile(rf'^(?:{_SHOW}\s+)?(?:the\s+)?first\s+{_N}\s+(?:{_ROWS}\s+{_IN}\s+)?{_TABLE}$')),
+    ('first_n', re.compile(rf'^{_SHOW}\s+{_N}\s+{_ROWS}\s+{_IN}\s+{_TABLE}$')),
+    ('count', re.compile(rf'^(?:count|how many)(?:\s+(?:the|all))?\s+(?:{_ROWS}\s+)?(?:are\s+)?(?:there\s+)?(?:{_IN}\s+)?{_TABLE}(?:\s+(?:are\s+there|exist|rows|records))?$')),
+    ('count', re.compile(rf'^(?:what is\s+)?(?:the\s+)?(?:number|count)\s+of\s+(?:{_ROWS}\s+{_IN}\s+)?{_TABLE}$')),
+    ('describe', re.compile(rf'^(?:describe|desc)\s+{_TABLE}$')),
+    ('describe', re.compile(rf'^{_SHOW}\s+(?:the\s+)?(?:schema|structure|columns|column names|definition)\s+{_IN}\s+{_TABLE}$')),
+    ('describe', re.compile(rf'^what\s+(?:columns|fields)\s+(?:does|do|are in)\s+{_TABLE}(?:\s+have)?$')),
+    ('show_all', re.compile(rf'^{_SHOW}\s+(?:all\s+)?(?:the\s+)?(?:{_ROWS}\s+{_IN}\s+)?{_TABLE}$')),
+    ('show_all', re.compile(rf'^(?:all|every)\s+(?:{_ROWS}\s+{_IN}\s+)?{_TABLE}$')),
+]
+
+def quote_ident(name: str) -> str:
+    if re.fullmatch(r'[a-z_][a-z0-9_]*', name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+def _table_key(text: str) -> str:
+    """Spelling-insensitive key: 'Student Performance Factors' == 'studentperformancefactor'"""
+    key = re.sub(r'[^a-z0-9]', '', text.lower())
+    if len(key) > 4 and key.endswith('ies'):
+        return key[:-3] + 'y'
+    if len(key) > 3 and key.endswith('s') and not key.endswith('ss'):
+        return key[:-1]
+    return key
+
+class FastPathMatcher:
+    """Answers trivial questions (show all / count / describe / first N) without the LLM.
+
+    Only matches when the whole question fits a known pattern and names
+    exactly one table in the catalog; anything else returns None so the
+    caller falls back to the model.
+    """
+
+    def __init__(self, max_limit: int = 1000):
+        self.max_limit = max_limit
+        self._tables: Dict[str, List[str]] = {}
+        self.lookups = 0
+        self.hits = 0
+        self.intent_hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def set_catalog(self, tables: Dict[str, Any]):
+        """`tables` maps table name to its columns (any iterable)"""
+        index: Dict[str, List[str]] = {}
+        for table in tables:
+            index.setdefault(_table_key(table), []).append(table)
+        self._tables = index
+
+    def resolve_table(self, text: str) -> Optional[str]:
+        candidates = self._tables.get(_table_key(text), [])
+        return candidates[0] if len(candidates) == 1 else None
+
+    def _sql(self, intent: str, table: str, n: Optional[str]) -> Optional[str]:
+        ident = quote_ident(table)
+        if intent == 'show_all':
+            return f"SELECT * FROM {ident};"
+        if intent == 'count':
+            return f"SELECT COUNT(*) FROM {ident};"
+        if intent == 'describe':
+            literal = table.replace("'", "''")
+            return ("SELECT column_name, data_type, is_nullable, column_default "
+                    "FROM information_schema.columns "
+                    f"WHERE table_schema = 'public' AND table_name = '{literal}' "
+                    "ORDER BY ordinal_position;")
+        if intent == 'first_n':
+            limit = int(n) if n.isdigit() else NUMBER_WORDS[n]
+            if not 0 < limit <= self.max_limit:
+                return None
+            return f"SELECT * FROM {ident} LIMIT {limit};"
+        return None
+
+    def match(self, question: str) -> Optional[Dict[str, Any]]:
+        """Return {"sql", "intent", "table"} for a confident match, else None"""
+        text = re.sub(r'\s+', ' ', re.sub(r'[?.!;,]+', ' ', question.lower())).strip()
+        result = None
+        if self._tables:
+            for intent, pattern in INTENT_PATTERNS:
+                m = pattern.match(text)
+                if not m:
+                    continue
+                table = self.resolve_table(m.group('table'))
+                if table is None:
+                    continue
+                sql = self._sql(intent, table, m.groupdict().get('n'))
+                if sql is not None:
+                    result = {"sql": sql, "intent": intent, "table": table}
+                    break
+
+        with self._lock:
+            self.lookups += 1
+            if result is not None:
+                self.hits += 1
+                self.intent_hits[result["intent"]] = self.intent_hits.get(result["intent"], 0) + 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "by_intent": dict(self.intent_hits)
+            }
@@ -0,0 +1,602 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Callable, Tuple
+import numpy as np
+import sqlparse
+from result_cursors import is_pageable
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a natural-language question used in cache keys"""
+    text = re.sub(r'\s+', ' ', text.strip().lower())
+    return text.rstrip(' ?.!;')
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def normalize_sql(sql: str) -> str:
+    """Canonical SQL text: comments dropped, keywords upper-cased, whitespace collapsed"""
+    formatted = sqlparse.format(sql, keyword_case='upper', strip_comments=True)
+    return re.sub(r'\s+', ' ', formatted).strip().rstrip(';').strip()
+
+class PersistentCache:
+    """SQLite-backed key/value cache with TTL, LRU eviction and hit/miss counters.
+
+    Several caches can share one database file through different namespaces.
+    Recently used entries are also kept in an in-process LRU so repeated hits
+    never touch SQLite.
+    """
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 10000,
+                 ttl_seconds: float = 7 * 24 * 3600, memory_entries: int = 1024):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, last_access)")
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), now, now)
+            )
+            self._remember(key, value, now)
+            self._evict()
+
+    def _remember(self, key: str, value: Any, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        count = self._conn.execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                """DELETE FROM cache WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache WHERE namespace = ? ORDER BY last_access LIMIT ?
+                )""",
+                (self.namespace, self.namespace, count - self.max_entries)
+            )
+
+    def items(self):
+        """All live (key, value) pairs in this namespace, oldest access first"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, created_at FROM cache WHERE namespace = ? ORDER BY last_access",
+                (self.namespace,)
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value, created_at in rows if not self._expired(created_at, now)]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+class SQLCache:
+    """Exact-match NL-to-SQL cache keyed by question, schema fingerprint and model.
+
+    Because the schema fingerprint is part of the key, any schema change makes
+    old entries unreachable; they age out through TTL and LRU eviction.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 7 * 24 * 3600):
+        self.store = PersistentCache(path, "nl_to_sql", max_entries, ttl_seconds)
+
+    def make_key(self, user_query: str, schema_info: str, model: str) -> str:
+        return fingerprint("\x1f".join([normalize_query(user_query), fingerprint(schema_info), model]))
+
+    def get(self, user_query: str, schema_info: str, model: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(self.make_key(user_query, schema_info, model))
+
+    def put(self, user_query: str, schema_info: str, model: str, result: Dict[str, Any]):
+        self.store.put(self.make_key(user_query, schema_info, model), result)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+class ExplanationCache:
+    """Plain-English explanations keyed by normalized SQL and model.
+
+    Explanations depend only on the SQL text, so entries never expire by
+    default; LRU eviction still bounds the table.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 0):
+        self.store = PersistentCache(path, "explain", max_entries, ttl_seconds)
+
+    def make_key(self, sql: str, model: str) -> str:
+        return fingerprint("\x1f".join([normalize_sql(sql), model]))
+
+    def get(self, sql: str, model: str) -> Optional[str]:
+        return self.store.get(self.make_key(sql, model))
+
+    def put(self, sql: str, model: str, explanation: str):
+        self.store.put(self.make_key(sql, model), explanation)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+NUMBER_PATTERN = r'(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])'
+QUOTED_PATTERN = r'"([^"]+)"|\'([^\']+)\''
+
+def quote_literal(value: Any) -> str:
+    """Render a template parameter as a SQL literal for display"""
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+class TemplateCache:
+    """Caches SQL for questions that differ only in their literal values.
+
+    Numbers, quoted strings and known categorical values (e.g. Low/Medium/High)
+    are lifted out of the question, leaving a template such as
+    "students with exam score above {number}". The generated SQL is stored with
+    those literals replaced by %s placeholders, so the next question with the
+    same shape is answered by binding its own literals as parameters.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 7 * 24 * 3600):
+        self.store = PersistentCache(path, "nl_templates", max_entries, ttl_seconds)
+        self.vocabulary: Dict[str, str] = {}
+        self._vocabulary_pattern = None
+
+    def set_vocabulary(self, values):
+        """Register categorical values (case-insensitive) that count as literals"""
+        self.vocabulary = {str(v).lower(): str(v) for v in values if str(v).strip()}
+        if self.vocabulary:
+            # Longest first so "High School" wins over "High"
+            words = sorted(self.vocabulary, key=len, reverse=True)
+            self._vocabulary_pattern = re.compile(
+                r'(?<!\w)(' + '|'.join(re.escape(w) for w in words) + r')(?!\w)', re.IGNORECASE
+            )
+        else:
+            self._vocabulary_pattern = None
+
+    def extract(self, user_query: str):
+        """Split a question into a template string and its ordered literals"""
+        spans = []
+        for match in re.finditer(QUOTED_PATTERN, user_query):
+            spans.append((match.start(), match.end(), 'string', match.group(1) or match.group(2)))
+        for match in re.finditer(NUMBER_PATTERN, user_query):
+            text = match.group(0)
+            spans.append((match.start(), match.end(), 'number', float(text) if '.' in text else int(text)))
+        if self._vocabulary_pattern:
+            for match in self._vocabulary_pattern.finditer(user_query):
+                spans.append((match.start(), match.end(), 'enum', self.vocabulary[match.group(1).lower()]))
+
+        # Drop spans nested inside earlier ones (e.g. a number inside quotes)
+        spans.sort(key=lambda s: (s[0], -s[1]))
+        literals = []
+        last_end = -1
+        for span in spans:
+            if span[0] >= last_end:
+                literals.append(span)
+                last_end = span[1]
+
+        parts = []
+        cursor = 0
+        for start, end, kind, _ in literals:
+            parts.append(user_query[cursor:start])
+            parts.append('{' + kind + '}')
+            cursor = end
+        parts.append(user_query[cursor:])
+        return normalize_query(''.join(parts)), [(kind, value) for _, _, kind, value in literals]
+
+    def _make_key(self, template: str, schema_info: str, model: str) -> str:
+        return fingerprint("\x1f".join([template, fingerprint(schema_info), model]))
+
+    def _literal_pattern(self, kind: str, value: Any) -> str:
+        if kind == 'number':
+            return r'(?<![\w.\'])' + re.escape(str(value)) + r'(?![\w.\'])'
+        return r"'" + re.escape(str(value).replace("'", "''")) + r"'"
+
+    def lookup(self, user_query: str, schema_info: str, model: str) -> Optional[Dict[str, Any]]:
+        """Return {"sql", "sql_template", "params"} when a matching template exists"""
+        template, literals = self.extract(user_query)
+        if not literals:
+            return None
+        entry = self.store.get(self._make_key(template, schema_info, model))
+        if entry is None:
+            return None
+
+        params = []
+        for slot, (kind, value) in zip(entry["slots"], literals):
+            if slot != kind:
+                return None
+            params.append(value)
+        values = iter(params)
+        rendered = re.sub(
+            r'%%|%s',
+            lambda m: '%' if m.group(0) == '%%' else quote_literal(next(values)),
+            entry["sql_template"]
+        )
+        return {
+            "sql": rendered,
+            "sql_template": entry["sql_template"],
+            "params": params
+        }
+
+    def store_result(self, user_query: str, schema_info: str, model: str, sql: str) -> bool:
+        """Turn freshly generated SQL into a template; skipped if any literal is ambiguous"""
+        template, literals = self.extract(user_query)
+        if not literals:
+            return False
+
+        sql_template = sql.replace('%', '%%')
+        positions = []
+        for kind, value in literals:
+            matches = list(re.finditer(self._literal_pattern(kind, value), sql_template, re.IGNORECASE))
+            if len(matches) != 1:
+                return False
+            positions.append((matches[0].start(), matches[0].end(), kind))
+
+        # Placeholders must appear in the same order as the question's literals
+        if [p[0] for p in positions] != sorted(p[0] for p in positions):
+            return False
+        for start, end, _ in reversed(positions):
+            sql_template = sql_template[:start] + '%s' + sql_template[end:]
+
+        self.store.put(self._make_key(template, schema_info, model), {
+            "sql_template": sql_template,
+            "slots": [kind for kind, _ in literals]
+        })
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+# Words that say "fetch rows" without changing which rows; mapped to one token
+SELECT_VERBS = {'show', 'list', 'display', 'get', 'give', 'fetch', 'find', 'return', 'retrieve', 'select', 'see', 'view'}
+STOPWORDS = {'me', 'all', 'every', 'each', 'the', 'a', 'an', 'of', 'from', 'in', 'please', 'can', 'you',
+             'i', 'want', 'to', 'would', 'like', 'table', 'records', 'rows', 'entries', 'data', 'what', 'are', 'is',
+             'with', 'whose', 'who', 'that', 'which', 'have', 'has', 'there', 'any'}
+
+# Words that change what a question asks for; a semantic hit needs them to match exactly
+INTENT_WORDS = {
+    'delete', 'remove', 'update', 'change', 'set', 'insert', 'add', 'create', 'drop', 'truncate', 'alter',
+    'above', 'below', 'over', 'under', 'more', 'less', 'fewer', 'greater', 'higher', 'lower', 'least', 'most',
+    'exceed', 'exceeds', 'between', 'before', 'after', 'equal', 'not', 'no', 'without', 'except',
+    'count', 'number', 'many', 'average', 'avg', 'mean', 'sum', 'total', 'max', 'maximum', 'min', 'minimum',
+    'highest', 'lowest', 'distinct', 'unique',
+    'asc', 'desc', 'ascending', 'descending', 'sort', 'sorted', 'order', 'top', 'bottom', 'first', 'last'
+}
+
+@lru_cache(maxsize=65536)
+def _token_features(token: str, dim: int, weight: float = 1.0, char_grams: bool = True) -> Tuple[Tuple[int, float], ...]:
+    """Signed hashed features of one token: the word plus its character trigrams"""
+    features = [(token, weight)]
+    if char_grams:
+        padded = f"#{token}#"
+        features += [(padded[i:i + 3], 0.25 * weight) for i in range(len(padded) - 2)]
+    result = []
+    for feature, w in features:
+        h = zlib.crc32(feature.encode('utf-8'))
+        result.append((h % dim, w if (h >> 31) & 1 else -w))
+    return tuple(result)
+
+class SemanticCache:
+    """Offline similarity cache for rephrased questions.
+
+    Questions are embedded as signed, hashed word and character n-gram vectors
+    (no model download, no GPU). Random-hyperplane LSH buckets narrow a lookup
+    to a handful of candidates, which are then scored by exact cosine
+    similarity. Two questions only match if their literals (numbers, quoted
+    strings, categorical values) and intent words (verbs, comparators,
+    aggregates, sort direction) are identical, so "above 70" never reuses the
+    SQL for "above 80" or "below 70". Only read-only SELECTs are stored, so a
+    hit can never run a statement that writes.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.85, max_entries: int = 100000,
+                 ttl_seconds: float = 7 * 24 * 3600, dim: int = 256, bands: int = 48, bits: int = 16,
+                 literal_extractor: Optional[Callable[[str], Tuple[str, list]]] = None):
+        self.store = PersistentCache(path, "nl_semantic", max_entries, ttl_seconds)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.dim = dim
+        self.bands = bands
+        self.bits = bits
+        self.literal_extractor = literal_extractor
+
+        rng = np.random.default_rng(0)
+        self._planes = rng.standard_normal((dim, bands * bits)).astype(np.float32)
+        self._bit_weights = (1 << np.arange(bits)).astype(np.int64)
+        self._band_offsets = np.arange(bands, dtype=np.int64) << bits
+
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        # Removed entries leave None until the index is compacted
+        self._entries: List[Optional[Dict[str, Any]]] = []
+        # key -> position, least recently used first (mirrors the store's LRU)
+        self._positions: "OrderedDict[str, int]" = OrderedDict()
+        # scope -> {band << bits | signature: [positions]}
+        self._buckets: Dict[str, Dict[int, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self._load()
+
+    def _tokens(self, text: str) -> List[str]:
+        words = re.findall(r'[a-z0-9_]+', text.lower())
+        tokens = []
+        for word in words:
+            if word in SELECT_VERBS:
+                tokens.append('select')
+            elif word not in STOPWORDS:
+                # Light stemming: products -> product, categories -> category
+                if len(word) > 4 and word.endswith('ies'):
+                    word = word[:-3] + 'y'
+                elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+                    word = word[:-1]
+                tokens.append(word)
+        return tokens
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = self._tokens(text)
+        for token in tokens:
+            for index, weight in _token_features(token, self.dim):
+                vector[index] += weight
+        for a, b in zip(tokens, tokens[1:]):
+            for index, weight in _token_features(a + ' ' + b, self.dim, 0.7, False):
+                vector[index] += weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _signatures(self, vector: np.ndarray) -> List[int]:
+        bits = (vector @ self._planes > 0).reshape(self.bands, self.bits)
+        return (bits @ self._bit_weights + self._band_offsets).tolist()
+
+    def _literals(self, text: str) -> list:
+        if self.literal_extractor:
+            literals = self.literal_extractor(text)[1]
+        else:
+            literals = re.findall(NUMBER_PATTERN + '|' + QUOTED_PATTERN.replace('(', '(?:'), text)
+        # Same shape as after a JSON round trip through the store
+        return json.loads(json.dumps(literals))
+
+    def _intent(self, text: str) -> List[str]:
+        words = re.findall(r'[a-z]+', text.lower())
+        return ['select' if w in SELECT_VERBS else w for w in words if w in INTENT_WORDS or w in SELECT_VERBS]
+
+    def _scope(self, schema_info: str, model: str) -> str:
+        return fingerprint(fingerprint(schema_info) + "\x1f" + model)[:16]
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["created_at"] > self.ttl_seconds
+
+    def _index(self, key: str, entry: Dict[str, Any]):
+        entry.setdefault("intent", self._intent(entry["question"]))
+        vector = self.embed(entry["question"])
+        position = len(self._entries)
+        if position >= len(self._vectors):
+            # Grow by doubling so indexing stays amortized O(1)
+            grown = np.zeros((max(1024, 2 * len(self._vectors)), self.dim), dtype=np.float32)
+            grown[:position] = self._vectors[:position]
+            self._vectors = grown
+        self._entries.append(entry)
+        self._positions[key] = position
+        self._vectors[position] = vector
+        buckets = self._buckets[entry["scope"]]
+        for signature in self._signatures(vector):
+            buckets[signature].append(position)
+
+    def _remove(self, key: str):
+        position = self._positions.pop(key, None)
+        if position is not None:
+            self._entries[position] = None
+        # Rebuild once most slots are dead so buckets and vectors stay bounded
+        dead = len(self._entries) - len(self._positions)
+        if dead > 1024 and dead > len(self._positions):
+            self._compact()
+
+    def _compact(self):
+        live = [(key, self._entries[position]) for key, position in self._positions.items()]
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._entries = []
+        self._positions = OrderedDict()
+        self._buckets = defaultdict(lambda: defaultdict(list))
+        for key, entry in live:
+            self._index(key, entry)
+
+    def _enforce_limit(self):
+        while len(self._positions) > self.max_entries:
+            self._remove(next(iter(self._positions)))
+
+    def _load(self):
+        now = time.time()
+        for key, entry in self.store.items():
+            # Entries written before created_at was stored live until the store expires them
+            entry.setdefault("created_at", now)
+            entry["key"] = key
+            if not is_pageable(entry["sql"]):
+                # Written before only read-only SQL was stored
+                continue
+            self._index(key, entry)
+        self._enforce_limit()
+
+    def lookup(self, user_query: str, schema_info: str, model: str) -> Optional[Dict[str, Any]]:
+        """Return the cached SQL of the most similar question above the threshold"""
+        scope = self._scope(schema_info, model)
+        vector = self.embed(user_query)
+        with self._lock:
+            self.lookups += 1
+            buckets = self._buckets.get(scope, {})
+            candidates = set()
+            for signature in self._signatures(vector):
+                candidates.update(buckets.get(signature, ()))
+            if not candidates:
+                return None
+
+            ids = np.fromiter(candidates, dtype=np.int64)
+            scores = self._vectors[ids] @ vector
+            literals = self._literals(user_query)
+            intent = self._intent(user_query)
+            now = time.time()
+            stale = []
+            match = None
+            for i in np.argsort(-scores):
+                if scores[i] < self.threshold:
+                    break
+                entry = self._entries[ids[i]]
+                if entry is None or entry["literals"] != literals or entry["intent"] != intent:
+                    continue
+                # Expired here, or evicted from SQLite (possibly by another process)
+                if self._expired(entry, now) or self.store.get(entry["key"]) is None:
+                    stale.append(entry["key"])
+                    continue
+                match = {"sql": entry["sql"], "matched_question": entry["question"],
+                         "similarity": round(float(scores[i]), 4)}
+                self._positions.move_to_end(entry["key"])
+                self.hits += 1
+                break
+
+            # Removing may compact the index, so only after the scan
+            for key in stale:
+                self._remove(key)
+            return match
+
+    def add(self, user_query: str, schema_info: str, model: str, sql: str):
+        if not is_pageable(sql):
+            # Reusing SQL that writes for a merely similar question is never safe
+            return
+        scope = self._scope(schema_info, model)
+        key = fingerprint(scope + "\x1f" + normalize_query(user_query))
+        entry = {
+            "key": key,
+            "question": user_query,
+            "sql": sql,
+            "scope": scope,
+            "literals": self._literals(user_query),
+            "intent": self._intent(user_query),
+            "created_at": time.time()
+        }
+        with self._lock:
+            self.store.put(key, entry)
+            # Re-adding a question replaces its old vector instead of duplicating it
+            self._remove(key)
+            self._index(key, entry)
+            self._enforce_limit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "namespace": "nl_semantic",
+            "entries": len(self._positions),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "threshold": self.threshold
+        }
+
+_shared_caches: Dict[str, Dict[str, Any]] = {}
+_shared_caches_lock = threading.Lock()
+
+def get_shared_caches(config) -> Dict[str, Any]:
+    """Return the process-wide LLM caches, built once per cache file.
+
+    Every LLMClient in the process (one per Streamlit session, the MCP
+    servers) shares these, so the semantic index is loaded only once.
+    """
+    if not config.LLM_CACHE_ENABLED:
+        return {"exact": None, "template": None, "semantic": None, "explain": None}
+
+    with _shared_caches_lock:
+        caches = _shared_caches.get(config.LLM_CACHE_PATH)
+        if caches is None:
+            exact = SQLCache(config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_ENTRIES, config.LLM_CACHE_TTL)
+            template = TemplateCache(
+                config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_ENTRIES, config.LLM_CACHE_TTL
+            ) if config.LLM_TEMPLATE_CACHE_ENABLED else None
+            semantic = SemanticCache(
+                config.LLM_CACHE_PATH,
+                threshold=config.LLM_SEMANTIC_THRESHOLD,
+                max_entries=config.LLM_SEMANTIC_MAX_ENTRIES,
+                ttl_seconds=config.LLM_CACHE_TTL,
+                literal_extractor=template.extract if template else None
+            ) if config.LLM_SEMANTIC_CACHE_ENABLED else None
+            explain = ExplanationCache(config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_ENTRIES)
+            caches = {"exact": exact, "template": template, "semantic": semantic, "explain": explain}
+            _shared_caches[config.LLM_CACHE_PATH] = caches
+        return caches
@@ -1,9 +1,101 @@
 # llm_client.py
 
+import asyncio
+import json
+import queue
+import random
 import re
-from typing import Dict, Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import sqlparse
+from sqlparse import tokens as T
 from config import Config
-from groq import Groq  # Import Groq instead of openai
+from groq import Groq, AsyncGroq, RateLimitError  # Import Groq instead of openai
+from llm_cache import get_shared_caches, normalize_sql
+from intent_matcher import FastPathMatcher
+from sql_validator import SQLValidator
+from rate_limiter import get_shared_rate_limiter
+from resilience import get_shared_caller
+from schema_context import estimate_tokens
+
+EXPLAIN_FAILED = "Could not generate explanation"
+
+# Background explanation work shared by all clients in the process
+_explain_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-explain")
+_explain_pending: Dict[str, Future] = {}
+_explain_pending_lock = threading.Lock()
+
+def _settle_explanation(key: str, future: Future, explanation: str):
+    """Resolve a prefetch's placeholder future and unregister it; later calls are no-ops"""
+    with _explain_pending_lock:
+        if _explain_pending.get(key) is future:
+            del _explain_pending[key]
+        if future.done():
+            return
+        future.set_result(explanation)
+
+OPENING_FENCE = re.compile(r'^\s*```(?:sql)?\s*', re.IGNORECASE)
+
+def clean_sql_response(text: str) -> str:
+    """Strip markdown fences, tags and comment lines from a model completion"""
+    sql_query = text.strip()
+    
+    # Clean up the response - remove various formatting
+    if sql_query.startswith("```sql"):
+        sql_query = sql_query[6:]
+    if sql_query.startswith("```"):
+        sql_query = sql_query[3:]
+    if sql_query.endswith("```"):
+        sql_query = sql_query[:-3]
+    
+    sql_query = re.sub(r'<[^>]+>', '', sql_query)
+    sql_query = sql_query.strip()
+    
+    lines = sql_query.split('\n')
+    sql_lines = [line.strip() for line in lines if line.strip() and not line.startswith('#') and not line.startswith('--')]
+    
+    if sql_lines:
+        sql_query = ' '.join(sql_lines)
+    return sql_query
+
+def _is_complete_statement(statement: str) -> bool:
+    tokens = [t for t in sqlparse.parse(statement)[0].flatten() if not t.is_whitespace]
+    if not tokens or not tokens[-1].match(T.Punctuation, ';'):
+        return False
+    # An unterminated quote lexes as Error; the ';' is then inside a literal
+    return not any(t.ttype is T.Error for t in tokens)
+
+def find_sql_end(text: str) -> Optional[str]:
+    """The SQL part of a partial completion once it is known to be finished, else None.
+
+    SQL ends at a closing code fence, or after a complete statement followed by
+    something that does not start another statement (usually prose).
+    """
+    body = OPENING_FENCE.sub('', text, count=1)
+    if '```' in body:
+        return body.split('```', 1)[0]
+    if ';' not in body:
+        return None
+    
+    complete = []
+    remainder = None
+    for statement in sqlparse.split(body):
+        if remainder is None and _is_complete_statement(statement):
+            complete.append(statement)
+        else:
+            remainder = statement if remainder is None else f"{remainder} {statement}"
+    if not complete or remainder is None:
+        return None
+    
+    # Wait until the first word after the statement is finished
+    if not re.match(r'\s*\S+\s', remainder):
+        return None
+    first = sqlparse.parse(remainder)[0].token_first(skip_ws=True, skip_cm=True)
+    if first is None or first.ttype in T.Keyword:
+        return None
+    return '\n'.join(complete)
 
 class LLMClient:
     def __init__(self):
@@ -11,9 +103,174 @@ class LLMClient:
         # Initialize the Groq client
         self.client = Groq(
             api_key=self.config.GROQ_API_KEY,
+            base_url=self.config.GROQ_BASE_URL,
+            timeout=self.config.LLM_REQUEST_TIMEOUT,
+            # Retries, hedging and failover are handled by ResilientCaller
+            max_retries=0,
         )
+        self._async_client = None
+        self._async_loop = None
+        caches = get_shared_caches(self.config)
+        self.sql_cache = caches["exact"]
+        self.template_cache = caches["template"]
+        self.semantic_cache = caches["semantic"]
+        self.explain_cache = caches["explain"]
+        self.rate_limiter = get_shared_rate_limiter(self.config.GROQ_MODEL, self.config)
+        self.resilience = get_shared_caller(self.config)
+        self.fast_path = FastPathMatcher() if self.config.LLM_FAST_PATH_ENABLED else None
+        self.validator = None
+        self._catalog = None
+    
+    def set_literal_vocabulary(self, values):
+        """Categorical values (e.g. Low/Medium/High) the template cache treats as literals"""
+        if self.template_cache:
+            self.template_cache.set_vocabulary(values)
     
-    def generate_sql(self, user_query: str, schema_info: str = "") -> Dict[str, Any]:
+    def set_catalog(self, tables: Dict[str, Any]):
+        """Live table catalog (table -> columns) for the fast path and SQL validation"""
+        if tables is self._catalog:
+            # Same snapshot from the shared SchemaCatalog; nothing to rebuild
+            return
+        self._catalog = tables
+        if self.fast_path:
+            self.fast_path.set_catalog(tables)
+        if self.config.LLM_VALIDATE_SQL:
+            self.validator = SQLValidator(tables)
+    
+    def generate_sql(self, user_query: str, schema_info: str = "", schema_fingerprint: str = None,
+                     on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Convert natural language to SQL, answering trivial questions by rule and
+        repeated ones from the cache.
+
+        A template-cache hit also returns `sql_template` and `params`; callers
+        should execute the template with those bound parameters. When the
+        prompt only carries part of the schema, pass the full schema's
+        `schema_fingerprint` so cache entries are keyed on the whole schema.
+        With streaming enabled, `on_token` receives the completion text so far
+        and the result carries `latency` (time to first token, total).
+        """
+        schema_key = schema_fingerprint or schema_info
+        cached = self._lookup_cache(user_query, schema_key)
+        if cached is not None:
+            return cached
+        
+        result = self._generate_sql_uncached(user_query, schema_info, on_token)
+        if result["success"] and self.validator:
+            check = self.validator.validate(result["sql"])
+            if not check["valid"]:
+                repaired = self._repair_sql(user_query, schema_info, result["sql"], check["errors"])
+                result = self._checked_repair(result["sql"], check["errors"], repaired)
+        self._store_cache(user_query, schema_key, result)
+        return result
+    
+    async def agenerate_sql(self, user_query: str, schema_info: str = "",
+                            schema_fingerprint: str = None) -> Dict[str, Any]:
+        """Async generate_sql: waits for rate-limit budget, retries, hedges and fails over"""
+        schema_key = schema_fingerprint or schema_info
+        cached = self._lookup_cache(user_query, schema_key)
+        if cached is not None:
+            return cached
+        
+        messages = self._build_messages(user_query, schema_info)
+        try:
+            (content, latency), routing = await self.resilience.acall(
+                lambda model: self._acomplete(messages, model)
+            )
+            result = self._sql_result(user_query, content, {**latency, **routing})
+            if result["success"] and self.validator:
+                check = self.validator.validate(result["sql"])
+                if not check["valid"]:
+                    repair_messages = self._build_repair_messages(messages, result["sql"], check["errors"])
+                    (content, latency), routing = await self.resilience.acall(
+                        lambda model: self._acomplete(repair_messages, model)
+                    )
+                    repaired = self._sql_result(user_query, content, {**latency, **routing})
+                    result = self._checked_repair(result["sql"], check["errors"], repaired)
+        except Exception as e:
+            result = {"success": False, "error": f"LLM Error: {str(e)}"}
+        self._store_cache(user_query, schema_key, result)
+        return result
+    
+    async def agenerate_sql_batch(self, queries: List[str], schema_info: str = "",
+                                  schema_fingerprint: str = None,
+                                  max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Generate SQL for many questions concurrently; results keep input order"""
+        semaphore = asyncio.Semaphore(max_concurrency or self.config.LLM_MAX_CONCURRENCY)
+        
+        async def run(query: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.agenerate_sql(query, schema_info, schema_fingerprint)
+        
+        # Repeated questions share one request
+        unique = list(dict.fromkeys(queries))
+        results = await asyncio.gather(*(run(query) for query in unique))
+        by_query = dict(zip(unique, results))
+        return [by_query[query] for query in queries]
+    
+    def generate_sql_batch(self, queries: List[str], schema_info: str = "",
+                           schema_fingerprint: str = None,
+                           max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Blocking wrapper around agenerate_sql_batch (not for use inside a running event loop)"""
+        return asyncio.run(self.agenerate_sql_batch(queries, schema_info, schema_fingerprint, max_concurrency))
+    
+    def _lookup_cache(self, user_query: str, schema_key: str) -> Optional[Dict[str, Any]]:
+        model = self.config.GROQ_MODEL
+        explanation = f"Generated SQL for: {user_query}"
+        if self.fast_path:
+            matched = self.fast_path.match(user_query)
+            if matched is not None:
+                return {"success": True, "sql": matched["sql"], "explanation": explanation,
+                        "cached": "fast_path", "intent": matched["intent"]}
+        
+        if self.sql_cache:
+            cached = self.sql_cache.get(user_query, schema_key, model)
+            if cached is not None:
+                return {**cached, "explanation": explanation, "cached": "exact"}
+        
+        if self.template_cache:
+            filled = self.template_cache.lookup(user_query, schema_key, model)
+            if filled is not None:
+                return {"success": True, **filled, "explanation": explanation, "cached": "template"}
+        
+        if self.semantic_cache:
+            similar = self.semantic_cache.lookup(user_query, schema_key, model)
+            if similar is not None:
+                return {"success": True, **similar, "explanation": explanation, "cached": "semantic"}
+        return None
+    
+    def _store_cache(self, user_query: str, schema_key: str, result: Dict[str, Any]):
+        if not result["success"]:
+            return
+        model = self.config.GROQ_MODEL
+        if self.sql_cache:
+            self.sql_cache.put(user_query, schema_key, model, {"success": True, "sql": result["sql"]})
+        if self.template_cache:
+            self.template_cache.store_result(user_query, schema_key, model, result["sql"])
+        if self.semantic_cache:
+            self.semantic_cache.add(user_query, schema_key, model, result["sql"])
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        if not self.sql_cache:
+            return {"enabled": False}
+        stats = {"exact": self.sql_cache.stats()}
+        if self.template_cache:
+            stats["template"] = self.template_cache.stats()
+        if self.semantic_cache:
+            stats["semantic"] = self.semantic_cache.stats()
+        if self.explain_cache:
+            stats["explain"] = self.explain_cache.stats()
+        return stats
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Fast-path hit rate, cache, rate-limiter and per-model health counters"""
+        return {
+            "fast_path": self.fast_path.stats() if self.fast_path else {"enabled": False},
+            "cache": self.cache_stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "models": self.resilience.stats()
+        }
+    
+    def _build_messages(self, user_query: str, schema_info: str) -> List[Dict[str, str]]:
         system_prompt = f"""You are a PostgreSQL SQL generator. Convert natural language to valid SQL.
 
 Schema: {schema_info}
@@ -31,68 +288,387 @@ Input: "create table products with id and name"
 Output: CREATE TABLE products (id SERIAL PRIMARY KEY, name VARCHAR(255));
 
 Generate only valid PostgreSQL SQL:"""
-
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_query}
+        ]
+    
+    def _estimate_request_tokens(self, messages: List[Dict[str, str]], max_tokens: int = 500) -> int:
+        return sum(estimate_tokens(m["content"]) for m in messages) + max_tokens
+    
+    def _reserve(self, messages: List[Dict[str, str]], max_tokens: int = 500) -> Callable[[str], list]:
+        """`reserve` hook for ResilientCaller: wait for the model's budget before an attempt starts"""
+        tokens = self._estimate_request_tokens(messages, max_tokens)
+        return lambda model: get_shared_rate_limiter(model, self.config).acquire(tokens)
+    
+    def _retry_delay(self, error: RateLimitError, attempt: int) -> float:
+        retry_after = error.response.headers.get("retry-after") if error.response is not None else None
         try:
-            response = self.client.chat.completions.create(
-                # Use the Groq model from config
-                model=self.config.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_query}
-                ],
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return min(60.0, self.config.LLM_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+    
+    def _get_async_client(self) -> AsyncGroq:
+        # httpx async clients are tied to the event loop that first used them
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = AsyncGroq(
+                api_key=self.config.GROQ_API_KEY,
+                base_url=self.config.GROQ_BASE_URL,
+                timeout=self.config.LLM_REQUEST_TIMEOUT,
+                max_retries=0,
+            )
+            self._async_loop = loop
+        return self._async_client
+    
+    def _note_rate_limit(self, model: str, error: Exception):
+        if isinstance(error, RateLimitError):
+            get_shared_rate_limiter(model, self.config).pause(self._retry_delay(error, 0))
+    
+    async def _acomplete(self, messages: List[Dict[str, str]], model: str) -> Tuple[str, Dict[str, Any]]:
+        limiter = get_shared_rate_limiter(model, self.config)
+        reservation = await limiter.acquire_async(self._estimate_request_tokens(messages))
+        started = time.perf_counter()
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                model=model,
+                messages=messages,
                 temperature=0.1,
                 max_tokens=500
             )
-            
-            sql_query = response.choices[0].message.content.strip()
-            
-            # Clean up the response - remove various formatting
-            if sql_query.startswith("```sql"):
-                sql_query = sql_query[6:]
-            if sql_query.startswith("```"):
-                sql_query = sql_query[3:]
-            if sql_query.endswith("```"):
-                sql_query = sql_query[:-3]
-            
-            sql_query = re.sub(r'<[^>]+>', '', sql_query)
-            sql_query = sql_query.strip()
-            
-            lines = sql_query.split('\n')
-            sql_lines = [line.strip() for line in lines if line.strip() and not line.startswith('#') and not line.startswith('--')]
-            
-            if sql_lines:
-                sql_query = ' '.join(sql_lines)
-            
-            if not sql_query or len(sql_query.strip()) < 5:
-                return {
-                    "success": False,
-                    "error": "LLM returned empty or invalid SQL response"
-                }
-            
+        except (Exception, asyncio.CancelledError) as e:
+            # Nothing was generated (or the losing hedge was cancelled): release the estimate
+            limiter.record_usage(reservation, 0)
+            self._note_rate_limit(model, e)
+            raise
+        
+        if response.usage is not None:
+            limiter.record_usage(reservation, response.usage.total_tokens)
+        total_ms = (time.perf_counter() - started) * 1000
+        latency = {"streamed": False, "ttft_ms": total_ms, "total_ms": total_ms, "stopped_early": False}
+        return response.choices[0].message.content, latency
+    
+    def _complete(self, messages: List[Dict[str, str]], model: str, max_tokens: int = 500,
+                  reservation: Optional[list] = None,
+                  cancel: Optional[threading.Event] = None) -> Tuple[str, Dict[str, Any]]:
+        """Whole completion; with `cancel` it is streamed so a losing attempt can stop early"""
+        if cancel is not None:
+            return self._complete_streaming(messages, model, cancel=cancel, reservation=reservation,
+                                            max_tokens=max_tokens, stop_at_sql_end=False)
+        limiter = get_shared_rate_limiter(model, self.config)
+        if reservation is None:
+            reservation = limiter.acquire(self._estimate_request_tokens(messages, max_tokens))
+        started = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=max_tokens
+            )
+        except Exception as e:
+            # Any failed request generated nothing: release the estimate
+            limiter.record_usage(reservation, 0)
+            self._note_rate_limit(model, e)
+            raise
+        if response.usage is not None:
+            limiter.record_usage(reservation, response.usage.total_tokens)
+        total_ms = (time.perf_counter() - started) * 1000
+        latency = {"streamed": False, "ttft_ms": total_ms, "total_ms": total_ms, "stopped_early": False}
+        return response.choices[0].message.content, latency
+    
+    def _complete_streaming(self, messages: List[Dict[str, str]], model: str,
+                            on_token: Optional[Callable[[str], None]] = None,
+                            cancel: Optional[threading.Event] = None,
+                            reservation: Optional[list] = None, max_tokens: int = 500,
+                            stop_at_sql_end: bool = True) -> Tuple[str, Dict[str, Any]]:
+        """Consume the completion incrementally and close it once the SQL has ended"""
+        limiter = get_shared_rate_limiter(model, self.config)
+        if reservation is None:
+            reservation = limiter.acquire(self._estimate_request_tokens(messages, max_tokens))
+        started = time.perf_counter()
+        first_token_at = None
+        stopped_early = False
+        parts = []
+        usage = None
+        if cancel is not None and cancel.is_set():
+            # Another model answered while this attempt waited to start
+            limiter.record_usage(reservation, 0)
+            return '', {"streamed": True, "ttft_ms": 0.0, "total_ms": 0.0, "stopped_early": True}
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                stream=True
+            )
+        except Exception as e:
+            # Any failed request generated nothing: release the estimate
+            limiter.record_usage(reservation, 0)
+            self._note_rate_limit(model, e)
+            raise
+        try:
+            for chunk in stream:
+                # The final chunk reports usage (x_groq.usage, or usage in OpenAI style)
+                chunk_usage = chunk.usage or (chunk.x_groq.usage if chunk.x_groq else None)
+                if chunk_usage is not None:
+                    usage = chunk_usage.total_tokens
+                if cancel is not None and cancel.is_set():
+                    # Another model already answered
+                    break
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(delta)
+                text = ''.join(parts)
+                if on_token:
+                    on_token(text)
+                if stop_at_sql_end and (';' in text or '```' in text[3:]):
+                    sql_text = find_sql_end(text)
+                    if sql_text is not None:
+                        parts = [sql_text]
+                        stopped_early = True
+                        break
+        finally:
+            # Closing the response stops generation we would throw away
+            stream.close()
+            if usage is None:
+                # Stopped before the usage chunk: settle on prompt + streamed text
+                usage = self._estimate_request_tokens(messages, estimate_tokens(''.join(parts)))
+            limiter.record_usage(reservation, usage)
+        
+        finished = time.perf_counter()
+        latency = {
+            "streamed": True,
+            "ttft_ms": ((first_token_at or finished) - started) * 1000,
+            "total_ms": (finished - started) * 1000,
+            "stopped_early": stopped_early
+        }
+        return ''.join(parts), latency
+    
+    def _generate_sql_uncached(self, user_query: str, schema_info: str = "",
+                               on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        messages = self._build_messages(user_query, schema_info)
+        caller_thread = threading.get_ident()
+        tokens = queue.Queue()
+        owner = []
+        
+        def attempt(model: str, reservation: list,
+                    cancel: Optional[threading.Event]) -> Tuple[str, Dict[str, Any]]:
+            if self.config.LLM_STREAMING:
+                emit = None
+                if on_token:
+                    def emit(text: str):
+                        tokens.put((model, text))
+                        if threading.get_ident() == caller_thread:
+                            forward_tokens()
+                return self._complete_streaming(messages, model, emit, cancel, reservation)
+            return self._complete(messages, model, reservation=reservation, cancel=cancel)
+        
+        def forward_tokens():
+            # Runs on the caller's thread; only one model's stream is shown
+            while True:
+                try:
+                    model, text = tokens.get_nowait()
+                except queue.Empty:
+                    return
+                if not owner:
+                    owner.append(model)
+                if owner[0] == model:
+                    on_token(text)
+        
+        try:
+            (content, latency), routing = self.resilience.call(attempt, forward_tokens if on_token else None,
+                                                               self._reserve(messages))
+            return self._sql_result(user_query, content, {**latency, **routing})
+        except Exception as e:
             return {
-                "success": True,
-                "sql": sql_query,
-                "explanation": f"Generated SQL for: {user_query}"
+                "success": False,
+                "error": f"LLM Error: {str(e)}"
             }
-            
+    
+    def _build_repair_messages(self, messages: List[Dict[str, str]], sql: str,
+                               errors: List[str]) -> List[Dict[str, str]]:
+        return messages + [
+            {"role": "assistant", "content": sql},
+            {"role": "user", "content": "That SQL is invalid for this schema: " + "; ".join(errors)
+                                        + ". Return ONLY the corrected SQL statement."}
+        ]
+    
+    def _repair_sql(self, user_query: str, schema_info: str, sql: str, errors: List[str]) -> Dict[str, Any]:
+        """One more model call with the validation errors; tokens are not shown to the caller"""
+        messages = self._build_repair_messages(self._build_messages(user_query, schema_info), sql, errors)
+        try:
+            (content, latency), routing = self.resilience.call(
+                lambda model, reservation, cancel: self._complete(messages, model, 500, reservation, cancel),
+                reserve=self._reserve(messages)
+            )
+            return self._sql_result(user_query, content, {**latency, **routing})
         except Exception as e:
+            return {"success": False, "error": f"LLM Error: {str(e)}"}
+    
+    def _checked_repair(self, sql: str, errors: List[str], repaired: Dict[str, Any]) -> Dict[str, Any]:
+        """Accept the repaired SQL only if it validates; never hand invalid SQL to the database"""
+        if repaired["success"]:
+            recheck = self.validator.validate(repaired["sql"])
+            if recheck["valid"]:
+                return {**repaired, "repaired": True, "validation_errors": errors}
+            sql, errors = repaired["sql"], recheck["errors"]
+        return {
+            "success": False,
+            "error": "Generated SQL failed validation: " + "; ".join(errors),
+            "sql": sql,
+            "validation_errors": errors
+        }
+    
+    def _sql_result(self, user_query: str, content: str, latency: Dict[str, Any]) -> Dict[str, Any]:
+        sql_query = clean_sql_response(content)
+        
+        if not sql_query or len(sql_query.strip()) < 5:
             return {
                 "success": False,
-                "error": f"LLM Error: {str(e)}"
+                "error": "LLM returned empty or invalid SQL response",
+                "latency": latency
             }
+        
+        return {
+            "success": True,
+            "sql": sql_query,
+            "explanation": f"Generated SQL for: {user_query}",
+            "latency": latency
+        }
     
     def explain_query(self, sql_query: str) -> str:
+        """Plain-English explanation, served from the cache when the SQL was seen before"""
+        model = self.config.GROQ_MODEL
+        if self.explain_cache:
+            cached = self.explain_cache.get(sql_query, model)
+            if cached is not None:
+                return cached
+        
+        messages = [
+            {"role": "system", "content": "Explain this SQL query in simple terms:"},
+            {"role": "user", "content": sql_query}
+        ]
         try:
-            response = self.client.chat.completions.create(
-                # Use the Groq model from config
-                model=self.config.GROQ_MODEL,
-                messages=[
-                    {"role": "system", "content": "Explain this SQL query in simple terms:"},
-                    {"role": "user", "content": sql_query}
-                ],
-                temperature=0.1,
-                max_tokens=200
+            (content, _), _ = self.resilience.call(
+                lambda m, reservation, cancel: self._complete(messages, m, 200, reservation, cancel),
+                reserve=self._reserve(messages, 200)
+            )
+            explanation = content.strip()
+        except Exception:
+            return EXPLAIN_FAILED
+        
+        if self.explain_cache and explanation:
+            self.explain_cache.put(sql_query, model, explanation)
+        return explanation or EXPLAIN_FAILED
+    
+    def get_cached_explanation(self, sql_query: str) -> Optional[str]:
+        """Cached explanation or None; never calls the model"""
+        if not self.explain_cache:
+            return None
+        return self.explain_cache.get(sql_query, self.config.GROQ_MODEL)
+    
+    def explain_query_async(self, sql_query: str) -> Future:
+        """Start explaining in the background; concurrent requests for the same SQL share one call"""
+        cached = self.get_cached_explanation(sql_query)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        
+        key = normalize_sql(sql_query)
+        with _explain_pending_lock:
+            future = _explain_pending.get(key)
+            if future is None:
+                future = _explain_executor.submit(self.explain_query, sql_query)
+                _explain_pending[key] = future
+                future.add_done_callback(lambda _: _explain_pending.pop(key, None))
+        return future
+    
+    def prefetch_explanations(self, sql_queries: List[str], batch_size: Optional[int] = None,
+                              background: bool = False):
+        """Explain every uncached query, several per model call.
+
+        Each query is registered with `explain_query_async` while its batch
+        runs, so a request for it joins the batch instead of calling the
+        model again; queries another call is already explaining are skipped.
+        Returns {sql: explanation} for the queries that now have one, or a
+        Future of that mapping when `background` is True.
+        """
+        if background:
+            return _explain_executor.submit(self.prefetch_explanations, sql_queries, batch_size)
+        
+        batch_size = batch_size or self.config.LLM_EXPLAIN_BATCH_SIZE
+        keys = [normalize_sql(sql) for sql in sql_queries]
+        explanations = {}
+        missing = {}
+        placeholders: Dict[str, Future] = {}
+        for key, sql in zip(keys, sql_queries):
+            if key in explanations or key in missing:
+                continue
+            cached = self.get_cached_explanation(sql)
+            if cached is not None:
+                explanations[key] = cached
+                continue
+            with _explain_pending_lock:
+                if key in _explain_pending:
+                    continue
+                placeholders[key] = _explain_pending[key] = Future()
+            missing[key] = sql
+        
+        pending = list(missing.items())
+        try:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                results = self._explain_batch([sql for _, sql in batch])
+                for key, sql in batch:
+                    explanation = results.get(sql)
+                    if explanation is None and len(batch) > 1:
+                        # Unusable batch answer: someone may be waiting on this one
+                        explanation = self.explain_query(sql)
+                    if explanation is not None and explanation != EXPLAIN_FAILED:
+                        explanations[key] = explanation
+                    _settle_explanation(key, placeholders[key], explanation or EXPLAIN_FAILED)
+        finally:
+            for key, future in placeholders.items():
+                _settle_explanation(key, future, EXPLAIN_FAILED)
+        
+        return {sql: explanations[key] for key, sql in zip(keys, sql_queries) if key in explanations}
+    
+    def _explain_batch(self, batch: List[str]) -> Dict[str, str]:
+        if len(batch) == 1:
+            explanation = self.explain_query(batch[0])
+            return {} if explanation == EXPLAIN_FAILED else {batch[0]: explanation}
+        
+        numbered = "\n\n".join(f"{i}. {sql}" for i, sql in enumerate(batch, 1))
+        messages = [
+            {"role": "system", "content": "Explain each numbered SQL query in simple terms. "
+                                          "Reply with only a JSON object mapping each number to its explanation."},
+            {"role": "user", "content": numbered}
+        ]
+        try:
+            max_tokens = 200 * len(batch)
+            (content, _), _ = self.resilience.call(
+                lambda m, reservation, cancel: self._complete(messages, m, max_tokens, reservation, cancel),
+                reserve=self._reserve(messages, max_tokens)
             )
-            return response.choices[0].message.content.strip()
+            parsed = json.loads(content[content.index('{'):content.rindex('}') + 1])
         except Exception:
-            return "Could not generate explanation"
\ No newline at end of file
+            # Unparseable batch: the caller explains these one at a time
+            return {}
+        
+        model = self.config.GROQ_MODEL
+        results = {}
+        for i, sql in enumerate(batch, 1):
+            explanation = parsed.get(str(i))
+            if isinstance(explanation, str) and explanation.strip():
+                results[sql] = explanation.strip()
+                if self.explain_cache:
+                    self.explain_cache.put(sql, model, results[sql])
+        return results
@@ -3,6 +3,10 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from database import DatabaseManager
 from llm_client import LLMClient
+from schema_catalog import get_shared_catalog
+from result_cursors import CursorRegistry
+from query_pipeline import QueryPipeline
+from config import Config
 
 class QueryRequest(BaseModel):
     query: str
@@ -10,28 +14,31 @@ class QueryRequest(BaseModel):
 
 class SQLExecuteRequest(BaseModel):
     sql: str
+    page_size: Optional[int] = None
+    result_format: Optional[str] = None
+
+class FetchNextRequest(BaseModel):
+    token: str
+
+class AskRequest(BaseModel):
+    query: str
+    schema_context: Optional[str] = ""
+    page_size: Optional[int] = None
+    result_format: Optional[str] = None
 
 mcp = FastMCP("SQL CRUD Assistant")
 db_manager = DatabaseManager()
 llm_client = LLMClient()
+catalog = get_shared_catalog(db_manager)
+cursors = CursorRegistry(db_manager)
+pipeline = QueryPipeline(db_manager, llm_client, catalog, cursors)
+llm_client.set_literal_vocabulary(db_manager.get_categorical_values())
 
 @mcp.tool()
 def get_database_schema() -> Dict[str, Any]:
     """Get all tables and their schemas from the database"""
     try:
-        tables_result = db_manager.get_all_tables()
-        if not tables_result["success"]:
-            return {"error": "Failed to get tables"}
-        
-        schema_info = {}
-        if not tables_result["data"].empty:
-            for _, row in tables_result["data"].iterrows():
-                table_name = row["table_name"]
-                schema_result = db_manager.get_table_schema(table_name)
-                if schema_result["success"]:
-                    schema_info[table_name] = schema_result["data"].to_dict('records')
-        
-        return {"success": True, "schema": schema_info}
+        return {"success": True, "schema": catalog.get_schema()}
     except Exception as e:
         return {"error": str(e)}
 
@@ -39,32 +46,33 @@ def get_database_schema() -> Dict[str, Any]:
 def generate_sql_from_natural_language(request: QueryRequest) -> Dict[str, Any]:
     """Convert natural language to SQL query"""
     try:
-        # Get current schema for context
-        schema_result = get_database_schema()
-        schema_context = ""
-        
-        if schema_result.get("success"):
-            schema_context = str(schema_result["schema"])
-        
-        # Combine with provided context
-        full_context = f"{schema_context}\n{request.schema_context}"
-        
-        result = llm_client.generate_sql(request.query, full_context)
-        return result
+        # Schema context is limited to the tables relevant to the question
+        return pipeline.generate(request.query, request.schema_context or "")
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@mcp.tool()
+def ask(request: AskRequest) -> Dict[str, Any]:
+    """Answer a question in one call: generate SQL, validate it, execute it and return the first page"""
+    try:
+        return pipeline.ask(request.query, request.schema_context or "",
+                            request.page_size, request.result_format)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 @mcp.tool()
 def execute_sql_query(request: SQLExecuteRequest) -> Dict[str, Any]:
-    """Execute SQL query on the database"""
+    """Execute SQL query on the database; large results are returned a page at a time"""
     try:
-        result = db_manager.execute_query(request.sql)
-        
-        # Convert DataFrame to dict for JSON serialization
-        if result.get("success") and "data" in result:
-            result["data"] = result["data"].to_dict('records')
-        
-        return result
+        return cursors.execute(request.sql, request.page_size, request.result_format)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@mcp.tool()
+def fetch_next(request: FetchNextRequest) -> Dict[str, Any]:
+    """Fetch the next page of an execute_sql_query result using its next_token"""
+    try:
+        return cursors.fetch_next(request.token)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
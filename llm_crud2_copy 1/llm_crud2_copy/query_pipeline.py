@@ -0,0 +1,92 @@
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from config import Config
+from database import DatabaseManager
+from llm_client import LLMClient
+from result_cursors import CursorRegistry
+from schema_catalog import SchemaCatalog, get_shared_catalog
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+class QueryPipeline:
+    """Question -> SQL -> validation -> execution in one call, timing each stage.
+
+    Schema context comes from the shared SchemaCatalog and queries run on the
+    manager's pooled connections. With a CursorRegistry, SELECT results are
+    returned as a first page plus `next_token`; without one, `execute_query`'s
+    result (a DataFrame under "data") is returned as is.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, llm_client: LLMClient,
+                 catalog: Optional[SchemaCatalog] = None, cursors: Optional[CursorRegistry] = None):
+        self.db_manager = db_manager
+        self.llm_client = llm_client
+        self.catalog = catalog or get_shared_catalog(db_manager)
+        self.cursors = cursors
+
+    def schema_context(self, question: str, extra_context: str = "") -> Tuple[str, Optional[str]]:
+        """(prompt schema context for `question`, full-schema fingerprint)"""
+        try:
+            builder = self.catalog.get_builder()
+        except Exception:
+            return extra_context, None
+        self.llm_client.set_catalog(builder.schema)
+        pruned = builder.build(question, Config.SCHEMA_TOKEN_BUDGET)
+        context = f"{pruned}\n{extra_context}" if extra_context else pruned
+        return context, builder.fingerprint
+
+    def generate(self, question: str, extra_context: str = "",
+                 on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """generate_sql with catalog context; validation and repair happen inside"""
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        context, fingerprint = self.schema_context(question, extra_context)
+        timings["schema_ms"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        result = self.llm_client.generate_sql(question, context, fingerprint, on_token=on_token)
+        timings["generate_ms"] = _elapsed_ms(started)
+        return {**result, "timings": timings}
+
+    def execute(self, llm_result: Dict[str, Any], page_size: Optional[int] = None,
+                result_format: Optional[str] = None) -> Dict[str, Any]:
+        """Run generated SQL, binding template-cache parameters when present"""
+        if llm_result.get("params"):
+            sql, params = llm_result["sql_template"], tuple(llm_result["params"])
+        else:
+            sql, params = llm_result["sql"], None
+        if self.cursors is not None:
+            return self.cursors.execute(sql, page_size, result_format, params=params)
+        return self.db_manager.execute_query(sql, params)
+
+    def ask(self, question: str, extra_context: str = "", page_size: Optional[int] = None,
+            result_format: Optional[str] = None, on_token: Optional[Callable[[str], None]] = None,
+            on_sql: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Answer `question` end to end.
+
+        Returns {"success", "stage", "sql", "result", "timings", ...}; on
+        failure `stage` names the step that failed ("generate" or "execute").
+        `on_sql` is called with the generation result before execution starts.
+        """
+        started = time.perf_counter()
+        generated = self.generate(question, extra_context, on_token)
+        timings = generated.pop("timings")
+        response = {**generated, "question": question}
+
+        if not generated["success"]:
+            timings["total_ms"] = _elapsed_ms(started)
+            return {**response, "stage": "generate", "timings": timings}
+
+        if on_sql:
+            on_sql(generated)
+
+        execute_started = time.perf_counter()
+        result = self.execute(generated, page_size, result_format)
+        timings["execute_ms"] = _elapsed_ms(execute_started)
+        timings["total_ms"] = _elapsed_ms(started)
+
+        if not result.get("success"):
+            return {**response, "success": False, "stage": "execute", "error": result.get("error"),
+                    "result": result, "timings": timings}
+        return {**response, "stage": "execute", "result": result, "timings": timings}
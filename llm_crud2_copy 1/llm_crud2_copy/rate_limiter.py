@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+from config import Config
+
+class RateLimiter:
+    """Sliding-window budget for requests and tokens per minute.
+
+    Usable from threads (`acquire`) and from any asyncio event loop
+    (`acquire_async`); state is guarded by a plain lock so one limiter can be
+    shared across loops and threads in the process. Token reservations are
+    estimates and can be corrected with `record_usage` once the API reports
+    the real count.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, window: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._events = deque()  # [timestamp, tokens]
+        self._tokens_in_window = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        while self._events and now - self._events[0][0] >= self.window:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    def _try_reserve(self, tokens: int) -> Tuple[Optional[list], float]:
+        """Reserve budget, returning (reservation, 0) or (None, seconds to wait)"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return None, self._paused_until - now
+            self._prune(now)
+
+            over_requests = self.requests_per_minute > 0 and len(self._events) >= self.requests_per_minute
+            # A request larger than the whole budget still runs once the window is empty
+            over_tokens = (self.tokens_per_minute > 0 and self._events and
+                           self._tokens_in_window + tokens > self.tokens_per_minute)
+            if not over_requests and not over_tokens:
+                reservation = [now, tokens]
+                self._events.append(reservation)
+                self._tokens_in_window += tokens
+                return reservation, 0.0
+
+            if over_requests:
+                wait = self._events[0][0] + self.window - now
+            else:
+                # Wait until enough reserved tokens have left the window
+                needed = self._tokens_in_window + tokens - self.tokens_per_minute
+                freed = 0
+                wait = self.window
+                for timestamp, used in self._events:
+                    freed += used
+                    if freed >= needed:
+                        wait = timestamp + self.window - now
+                        break
+            return None, max(wait, 0.01)
+
+    def acquire(self, tokens: int = 0) -> list:
+        """Block the calling thread until the request fits the budget"""
+        while True:
+            reservation, wait = self._try_reserve(tokens)
+            if reservation is not None:
+                return reservation
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0) -> list:
+        """Wait without blocking the event loop until the request fits the budget"""
+        while True:
+            reservation, wait = self._try_reserve(tokens)
+            if reservation is not None:
+                return reservation
+            await asyncio.sleep(wait)
+
+    def record_usage(self, reservation: list, tokens: int):
+        """Replace a reservation's estimated token count with the actual usage"""
+        with self._lock:
+            if reservation in self._events:
+                self._tokens_in_window += tokens - reservation[1]
+            reservation[1] = tokens
+
+    def pause(self, seconds: float):
+        """Hold every caller back, e.g. after the API answered 429"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            return {
+                "requests_in_window": len(self._events),
+                "tokens_in_window": self._tokens_in_window,
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "paused_for": max(0.0, self._paused_until - now)
+            }
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+def get_shared_rate_limiter(model: str, config: Optional[Config] = None) -> RateLimiter:
+    """Return the process-wide limiter for a model; provider budgets are per model"""
+    config = config or Config()
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(model)
+        if limiter is None:
+            limiter = RateLimiter(config.LLM_REQUESTS_PER_MINUTE, config.LLM_TOKENS_PER_MINUTE)
+            _shared_limiters[model] = limiter
+        return limiter
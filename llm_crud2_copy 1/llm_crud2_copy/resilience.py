@@ -0,0 +1,344 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config import Config
+from groq import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+class CircuitOpenError(Exception):
+    """Raised when every configured model has an open circuit breaker"""
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, connection failures, 429 and 5xx are worth another attempt"""
+    if isinstance(error, (APIConnectionError, APITimeoutError, RateLimitError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+class CircuitBreaker:
+    """Stops traffic to a model after consecutive failures, probing again after a cool-down"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                # Let exactly one request through to test the model
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End an attempt that says nothing about the model's health (e.g. a 429)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures}
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one model"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    def __len__(self):
+        return len(self._samples)
+
+class ResilientCaller:
+    """Retries, hedging and circuit breaking around a per-model call.
+
+    `call(fn)` runs `fn(model, reservation, cancel)` for the first model whose
+    breaker allows it. If that has not returned by the hedge deadline (the
+    model's p95 latency), the next model is raced against it and the first
+    success wins; `cancel` (None when there is no race) is set so the loser
+    can stop early. Racing primaries run on a pool of LLM_HEDGE_WORKERS
+    threads; when it is busy the call runs unhedged on the calling thread.
+    Retryable failures are retried with full-jitter exponential backoff; a
+    429 is retried but not counted against the model's breaker.
+    """
+
+    def __init__(self, models: List[str], config: Optional[Config] = None):
+        config = config or Config()
+        self.models = [m for i, m in enumerate(models) if m and m not in models[:i]]
+        self.max_retries = config.LLM_MAX_RETRIES
+        self.backoff_base = config.LLM_BACKOFF_BASE
+        self.hedge_enabled = config.LLM_HEDGE_ENABLED and len(self.models) > 1
+        self.hedge_percentile = config.LLM_HEDGE_PERCENTILE
+        self.hedge_min_delay = config.LLM_HEDGE_MIN_DELAY
+        self.hedge_default_delay = config.LLM_HEDGE_DEFAULT_DELAY
+        self.breakers = {m: CircuitBreaker(config.LLM_BREAKER_FAILURES, config.LLM_BREAKER_RESET) for m in self.models}
+        self.latencies = {m: LatencyTracker() for m in self.models}
+        self.hedges = 0
+        self.hedge_wins = 0
+        # Only hedged attempts use the pool, so it bounds the extra load they add
+        workers = max(1, config.LLM_HEDGE_WORKERS)
+        self._hedge_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-hedge")
+        # Racing primaries get a pool of the same size; a slot is taken before
+        # submitting, so an attempt never queues behind abandoned ones
+        self._call_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-call")
+        self._call_slots = threading.BoundedSemaphore(workers)
+
+    def hedge_delay(self, model: str) -> float:
+        tracker = self.latencies[model]
+        if len(tracker) < 20:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, tracker.percentile(self.hedge_percentile))
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(30.0, self.backoff_base * 2 ** attempt))
+
+    def _next_model(self, exclude: Optional[str] = None) -> Optional[str]:
+        # allow() reserves a half-open probe, so only ask breakers we will use
+        for model in self.models:
+            if model != exclude and self.breakers[model].allow():
+                return model
+        return None
+
+    def _observe(self, model: str, started: float, error: Optional[Exception]):
+        if error is None:
+            self.latencies[model].add(time.monotonic() - started)
+            self.breakers[model].record_success()
+        elif isinstance(error, RateLimitError):
+            # Throttled, not broken: the backoff handles it, the breaker should not
+            self.breakers[model].release()
+        elif is_retryable(error):
+            self.breakers[model].record_failure()
+        else:
+            # The request itself was bad; the model is healthy
+            self.breakers[model].record_success()
+
+    def _run(self, fn: Callable[[str, Any, Optional[threading.Event]], Any], model: str, reservation: Any,
+             cancel: Optional[threading.Event]) -> Any:
+        started = time.monotonic()
+        try:
+            result = fn(model, reservation, cancel)
+        except Exception as e:
+            if cancel is not None and cancel.is_set():
+                # Failed while being abandoned; says nothing about the model
+                self.breakers[model].record_success()
+            else:
+                self._observe(model, started, e)
+            raise
+        if cancel is not None and cancel.is_set():
+            # Lost the race and was cut short, so its latency is not a sample
+            self.breakers[model].record_success()
+        else:
+            self._observe(model, started, None)
+        return result
+
+    def _start(self, fn: Callable[[str, Any, Optional[threading.Event]], Any], model: str, reservation: Any,
+               cancel: threading.Event) -> Optional[Future]:
+        """Run the primary attempt on the call pool, or return None when it is full"""
+        if not self._call_slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._call_executor.submit(self._run, fn, model, reservation, cancel)
+        except Exception:
+            self._call_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._call_slots.release())
+        return future
+
+    def _wait(self, futures, timeout: Optional[float], poll: Optional[Callable[[], None]]):
+        """Wait for the first future to finish, calling `poll` in this thread meanwhile"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            step = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if poll:
+                step = 0.05 if step is None else min(step, 0.05)
+            done, pending = wait(futures, timeout=step, return_when=FIRST_COMPLETED)
+            if poll:
+                poll()
+            if done or (deadline is not None and time.monotonic() >= deadline):
+                return done, pending
+
+    def _race(self, fn: Callable[[str, Any, Optional[threading.Event]], Any], primary: str, reservation: Any,
+              reserve: Optional[Callable[[str], Any]], poll: Optional[Callable[[], None]]) -> Tuple[Any, str, bool]:
+        """(result, winning model, hedged) for the primary raced against a hedge"""
+        cancel = threading.Event()
+        # A request blocked on the network cannot be interrupted, so the primary
+        # gets a pool thread and this one stays free to return the hedge's answer
+        started = self._start(fn, primary, reservation, cancel)
+        if started is None:
+            return self._run(fn, primary, reservation, None), primary, False
+        futures = {started: primary}
+        hedged = False
+        last_error = None
+        try:
+            # The deadline starts with the attempt: its budget was reserved above
+            done, _ = self._wait(futures, self.hedge_delay(primary), poll)
+            # Hedge when the primary is slow, fail over when it already failed
+            if not done or next(iter(done)).exception() is not None:
+                secondary = self._next_model(exclude=primary)
+                if secondary is not None:
+                    hedged = True
+                    self.hedges += 1
+                    # Wait for rate-limit budget here rather than inside a pool slot
+                    hedge_reservation = reserve(secondary) if reserve else None
+                    future = self._hedge_executor.submit(self._run, fn, secondary, hedge_reservation, cancel)
+                    futures[future] = secondary
+
+            pending = set(futures)
+            while pending:
+                done, pending = self._wait(pending, None, poll)
+                for future in done:
+                    if future.exception() is None:
+                        return future.result(), futures[future], hedged
+                    last_error = future.exception()
+        finally:
+            cancel.set()
+        raise last_error
+
+    def call(self, fn: Callable[[str, Any, Optional[threading.Event]], Any], poll: Optional[Callable[[], None]] = None,
+             reserve: Optional[Callable[[str], Any]] = None) -> Tuple[Any, Dict[str, Any]]:
+        """Return (fn's result, {"model", "hedged", "retries"}).
+
+        Without a model to hedge with, `fn` runs on the calling thread.
+        `reserve(model)`, when given, runs on the calling thread before each
+        attempt starts (e.g. to wait for rate-limit budget) and its result is
+        passed to `fn` as `reservation`. `poll` is called periodically on the
+        calling thread while a race is in progress (e.g. to forward streamed
+        tokens to a UI).
+        """
+        attempt = 0
+        while True:
+            primary = self._next_model()
+            if primary is None:
+                raise CircuitOpenError(f"Circuit open for all models: {', '.join(self.models)}")
+            reservation = reserve(primary) if reserve else None
+            try:
+                if self.hedge_enabled:
+                    result, model, hedged = self._race(fn, primary, reservation, reserve, poll)
+                else:
+                    result, model, hedged = self._run(fn, primary, reservation, None), primary, False
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+            else:
+                if model != primary:
+                    self.hedge_wins += 1
+                return result, {"model": model, "hedged": hedged, "retries": attempt}
+            time.sleep(self.backoff(attempt))
+            attempt += 1
+
+    async def acall(self, fn: Callable[[str], Awaitable[Any]]) -> Tuple[Any, Dict[str, Any]]:
+        """Async version of `call`; the losing hedged request is cancelled"""
+        async def run(model: str):
+            started = time.monotonic()
+            try:
+                result = await fn(model)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._observe(model, started, e)
+                raise
+            self._observe(model, started, None)
+            return result
+
+        attempt = 0
+        while True:
+            primary = self._next_model()
+            if primary is None:
+                raise CircuitOpenError(f"Circuit open for all models: {', '.join(self.models)}")
+            tasks = {asyncio.ensure_future(run(primary)): primary}
+            hedged = False
+            last_error = None
+
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(primary))
+            if self.hedge_enabled and (not done or next(iter(done)).exception() is not None):
+                secondary = self._next_model(exclude=primary)
+                if secondary is not None:
+                    hedged = True
+                    self.hedges += 1
+                    tasks[asyncio.ensure_future(run(secondary))] = secondary
+
+            pending = set(tasks)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            model = tasks[task]
+                            if model != primary:
+                                self.hedge_wins += 1
+                            return task.result(), {"model": model, "hedged": hedged, "retries": attempt}
+                        last_error = task.exception()
+            finally:
+                for task in pending:
+                    task.cancel()
+
+            if not is_retryable(last_error) or attempt >= self.max_retries:
+                raise last_error
+            await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": {
+                m: {**self.breakers[m].stats(), "p95_seconds": self.latencies[m].percentile(95)}
+                for m in self.models
+            },
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins
+        }
+
+_shared_callers: Dict[Tuple[str, ...], ResilientCaller] = {}
+_shared_callers_lock = threading.Lock()
+
+def get_shared_caller(config: Optional[Config] = None) -> ResilientCaller:
+    """Process-wide caller so breaker state and latency history are shared"""
+    config = config or Config()
+    models = (config.GROQ_MODEL, config.LLM_SECONDARY_MODEL or "")
+    with _shared_callers_lock:
+        caller = _shared_callers.get(models)
+        if caller is None:
+            caller = ResilientCaller(list(models), config)
+            _shared_callers[models] = caller
+        return caller
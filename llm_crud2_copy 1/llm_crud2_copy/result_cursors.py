@@ -0,0 +1,299 @@
+import secrets
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set
+import pandas as pd
+import sqlparse
+from sqlparse import tokens as T
+from config import Config
+from database import DatabaseManager, schema_generation
+from result_format import RESULT_FORMATS, encode_frame, pa
+
+# Built-in functions with effects a read cursor's final rollback would lose or not expect
+WRITING_FUNCTIONS = {
+    'nextval', 'setval', 'set_config', 'pg_notify', 'pg_advisory_lock', 'pg_advisory_lock_shared',
+    'pg_try_advisory_lock', 'pg_try_advisory_lock_shared', 'pg_cancel_backend', 'pg_terminate_backend',
+    'pg_reload_conf', 'pg_switch_wal', 'lo_create', 'lo_creat', 'lo_import', 'lo_export', 'lo_unlink'
+}
+
+def called_functions(sql: str) -> Set[str]:
+    """Names of the functions `sql` calls, as Postgres resolves them"""
+    names = set()
+    for statement in sqlparse.parse(sql):
+        tokens = [t for t in statement.flatten() if not t.is_whitespace]
+        for tok, nxt in zip(tokens, tokens[1:]):
+            if nxt.ttype is T.Punctuation and nxt.value == '(' and tok.ttype in (T.Name, T.Literal.String.Symbol):
+                value = tok.value
+                names.add(value[1:-1] if value.startswith('"') else value.lower())
+    return names
+
+def is_pageable(sql: str) -> bool:
+    """SELECT/WITH that only reads (anything else must commit, not run in a read cursor)"""
+    if not sql.strip().upper().startswith(('SELECT', 'WITH')):
+        return False
+    for statement in sqlparse.parse(sql):
+        for token in statement.flatten():
+            if token.ttype is T.Keyword.DML and token.value.upper() != 'SELECT':
+                return False
+            if token.ttype is T.Keyword and token.value.upper() == 'INTO':
+                # SELECT ... INTO creates a table
+                return False
+    return not called_functions(sql) & WRITING_FUNCTIONS
+
+class ResultCursor:
+    """One open server-side cursor plus the page fetched ahead of the client"""
+
+    def __init__(self, token: str, stream: Iterator[pd.DataFrame], owner: DatabaseManager,
+                 dedicated: bool, page_size: int, columns: List[str], pending: pd.DataFrame, offset: int,
+                 result_format: str = 'records'):
+        self.token = token
+        self.stream = stream
+        self.owner = owner
+        self.dedicated = dedicated
+        self.page_size = page_size
+        self.columns = columns
+        self.pending = pending
+        self.offset = offset
+        self.result_format = result_format
+        self.last_used = time.monotonic()
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def close(self):
+        """Release the cursor and its connection; caller holds `lock`"""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending = None
+        try:
+            self.stream.close()
+        finally:
+            if self.dedicated:
+                self.owner.disconnect()
+
+class CursorRegistry:
+    """Pages large SELECT results through server-side cursors.
+
+    `execute` returns the first page and, when more rows remain, an opaque
+    `next_token` for `fetch_next`. At most two pages per open cursor are held
+    in memory, at most `max_open` cursors (each holding a connection) stay
+    open, and cursors idle for longer than `ttl` seconds are closed.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, page_size: Optional[int] = None,
+                 max_page_size: Optional[int] = None, ttl: Optional[float] = None,
+                 max_open: Optional[int] = None):
+        self.db_manager = db_manager
+        self.page_size = page_size or Config.MCP_PAGE_SIZE
+        self.max_page_size = max_page_size or Config.MCP_MAX_PAGE_SIZE
+        self.ttl = Config.MCP_CURSOR_TTL if ttl is None else ttl
+        self.max_open = max(1, max_open or Config.MCP_MAX_OPEN_CURSORS)
+
+        self._cursors: Dict[str, ResultCursor] = {}
+        self._lock = threading.Lock()
+        # Function name -> may write (volatile, not built in); cleared when DDL runs
+        self._volatile: Dict[str, bool] = {}
+        self._volatile_generation = -1
+        self._reaper: Optional[threading.Thread] = None
+
+        self.opened = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _page_size(self, page_size: Optional[int]) -> int:
+        if not page_size:
+            return self.page_size
+        return max(1, min(int(page_size), self.max_page_size))
+
+    def _page(self, df: Optional[pd.DataFrame], columns: List[str], offset: int,
+              token: Optional[str], result_format: str = 'records') -> Dict[str, Any]:
+        if df is None:
+            df = pd.DataFrame(columns=columns)
+        return {
+            "success": True,
+            "columns": columns,
+            **encode_frame(df, result_format),
+            "row_offset": offset,
+            "rows_returned": len(df),
+            "has_more": token is not None,
+            "next_token": token
+        }
+
+    def _start_reaper(self):
+        if self._reaper is not None or self.ttl <= 0:
+            return
+
+        def reap():
+            while True:
+                time.sleep(max(1.0, min(self.ttl / 2, 30.0)))
+                self.expire()
+
+        self._reaper = threading.Thread(target=reap, name="cursor-reaper", daemon=True)
+        self._reaper.start()
+
+    def _remove(self, cursor: ResultCursor):
+        with self._lock:
+            if self._cursors.get(cursor.token) is cursor:
+                del self._cursors[cursor.token]
+
+    def expire(self) -> int:
+        """Close cursors idle for longer than the TTL; busy cursors are skipped"""
+        if self.ttl <= 0:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            stale = [c for c in self._cursors.values() if now - c.last_used > self.ttl]
+        closed = 0
+        for cursor in stale:
+            if not cursor.lock.acquire(blocking=False):
+                continue
+            try:
+                cursor.close()
+            finally:
+                cursor.lock.release()
+            self._remove(cursor)
+            closed += 1
+        self.expired += closed
+        return closed
+
+    def _make_room(self) -> bool:
+        """Evict the least recently used idle cursor once `max_open` are open"""
+        with self._lock:
+            if len(self._cursors) < self.max_open:
+                return True
+            candidates = sorted(self._cursors.values(), key=lambda c: c.last_used)
+        for cursor in candidates:
+            if not cursor.lock.acquire(blocking=False):
+                continue
+            try:
+                cursor.close()
+            finally:
+                cursor.lock.release()
+            self._remove(cursor)
+            self.evicted += 1
+            return True
+        return False
+
+    def _calls_volatile_functions(self, sql: str) -> bool:
+        """Whether `sql` calls a user-defined volatile function, which may write"""
+        names = called_functions(sql)
+        if not names:
+            return False
+        generation = schema_generation(self.db_manager.config)
+        with self._lock:
+            if generation != self._volatile_generation:
+                self._volatile = {}
+                self._volatile_generation = generation
+            unknown = [name for name in names if name not in self._volatile]
+        if unknown:
+            volatile = self.db_manager.get_volatile_functions(unknown)
+            if volatile is None:
+                # Could not tell; committing is the safe choice
+                return True
+            with self._lock:
+                self._volatile.update({name: name in volatile for name in unknown})
+        with self._lock:
+            return any(self._volatile.get(name, True) for name in names)
+
+    def execute(self, sql: str, page_size: Optional[int] = None, result_format: Optional[str] = None,
+                params: Optional[tuple] = None) -> Dict[str, Any]:
+        """Run `sql`; SELECTs return their first page and a continuation token"""
+        result_format = result_format or Config.MCP_RESULT_FORMAT
+        if result_format not in RESULT_FORMATS:
+            return {"success": False,
+                    "error": f"Unknown result_format '{result_format}'; expected one of {', '.join(RESULT_FORMATS)}"}
+        if result_format == 'arrow' and pa is None:
+            return {"success": False, "error": "result_format 'arrow' requires the pyarrow package"}
+
+        if not is_pageable(sql) or self._calls_volatile_functions(sql):
+            result = self.db_manager.execute_query(sql, params)
+            if result.get("success") and "data" in result:
+                result.update(encode_frame(result.pop("data"), result_format))
+            return result
+
+        page_size = self._page_size(page_size)
+        self.expire()
+        if not self._make_room():
+            return {"success": False, "error": "Too many open result cursors; try again shortly"}
+
+        # Without a pool an open cursor would pin the manager's only connection
+        dedicated = self.db_manager.pool is None
+        owner = DatabaseManager(use_pool=False) if dedicated else self.db_manager
+        stream = owner.iter_query(sql, params, chunk_size=page_size)
+        try:
+            first = next(stream, None)
+            ahead = next(stream, None) if first is not None and len(first) == page_size else None
+        except Exception as e:
+            stream.close()
+            if dedicated:
+                owner.disconnect()
+            return {"success": False, "error": str(e)}
+
+        # iter_query yields an empty frame for an empty result, so columns are known
+        columns = list(first.columns) if first is not None else []
+        if ahead is None:
+            stream.close()
+            if dedicated:
+                owner.disconnect()
+            return self._page(first, columns, 0, None, result_format)
+
+        token = secrets.token_urlsafe(16)
+        cursor = ResultCursor(token, stream, owner, dedicated, page_size, columns, ahead, len(first),
+                              result_format)
+        with self._lock:
+            self._cursors[token] = cursor
+        self.opened += 1
+        self._start_reaper()
+        return self._page(first, columns, 0, token, result_format)
+
+    def fetch_next(self, token: str) -> Dict[str, Any]:
+        """Return the page after the one `token` was issued with"""
+        with self._lock:
+            cursor = self._cursors.get(token)
+        if cursor is None:
+            return {"success": False, "error": "Unknown or expired cursor token"}
+
+        with cursor.lock:
+            if cursor.closed:
+                return {"success": False, "error": "Unknown or expired cursor token"}
+            page, offset = cursor.pending, cursor.offset
+            try:
+                ahead = next(cursor.stream, None) if len(page) == cursor.page_size else None
+            except Exception as e:
+                cursor.close()
+                self._remove(cursor)
+                return {"success": False, "error": str(e)}
+
+            cursor.last_used = time.monotonic()
+            if ahead is None:
+                cursor.close()
+                self._remove(cursor)
+                return self._page(page, cursor.columns, offset, None, cursor.result_format)
+            cursor.pending = ahead
+            cursor.offset += len(page)
+            return self._page(page, cursor.columns, offset, token, cursor.result_format)
+
+    def close(self, token: str) -> bool:
+        with self._lock:
+            cursor = self._cursors.pop(token, None)
+        if cursor is None:
+            return False
+        with cursor.lock:
+            cursor.close()
+        return True
+
+    def close_all(self):
+        with self._lock:
+            tokens = list(self._cursors)
+        for token in tokens:
+            self.close(token)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            open_count = len(self._cursors)
+        return {
+            "open": open_count,
+            "opened": self.opened,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
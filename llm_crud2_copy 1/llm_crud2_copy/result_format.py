@@ -0,0 +1,80 @@
+import base64
+import json
+from typing import Any, Dict, List
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: only needed for result_format="arrow"
+    pa = None
+
+# "records" repeats every column name per row and stays the default for compatibility
+RESULT_FORMATS = ('records', 'columnar', 'arrow')
+
+# pandas.api.types.infer_dtype results -> header type names
+INFERRED_TYPES = {
+    'integer': 'integer', 'floating': 'float', 'mixed-integer-float': 'float', 'decimal': 'decimal',
+    'boolean': 'boolean', 'string': 'string', 'bytes': 'bytes', 'date': 'date',
+    'datetime': 'timestamp', 'datetime64': 'timestamp', 'time': 'time',
+    'timedelta': 'interval', 'timedelta64': 'interval', 'empty': 'null'
+}
+
+def column_types(df: pd.DataFrame) -> List[str]:
+    """Logical type of each column, inferred from the values (skipping nulls)"""
+    return [INFERRED_TYPES.get(pd.api.types.infer_dtype(df[c], skipna=True), 'mixed') for c in df.columns]
+
+def _column_values(series: pd.Series) -> List[Any]:
+    """Column as a JSON-ready list; nulls (NaN/NaT/None) become None"""
+    if series.dtype.kind == 'M':
+        values = series.dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+    else:
+        values = series
+    if values.hasnans:
+        return values.astype(object).where(values.notna(), None).tolist()
+    return values.tolist()
+
+def to_columnar(df: pd.DataFrame) -> Dict[str, Any]:
+    """Column names and types once, then one value array per column"""
+    return {
+        "format": "columnar",
+        "columns": [str(c) for c in df.columns],
+        "types": column_types(df),
+        "data": [_column_values(df[c]) for c in df.columns]
+    }
+
+def to_arrow(df: pd.DataFrame) -> Dict[str, Any]:
+    """Arrow IPC stream, base64-encoded so it fits in a JSON message"""
+    if pa is None:
+        raise ValueError("result_format 'arrow' requires the pyarrow package")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return {
+        "format": "arrow",
+        "encoding": "base64",
+        "columns": [str(c) for c in df.columns],
+        "types": column_types(df),
+        "data": base64.b64encode(sink.getvalue().to_pybytes()).decode('ascii')
+    }
+
+def encode_frame(df: pd.DataFrame, result_format: str = 'records') -> Dict[str, Any]:
+    """Result fields for `df` in the requested format (merged into a tool response)"""
+    if result_format == 'records':
+        return {"data": df.to_dict('records')}
+    if result_format == 'columnar':
+        return to_columnar(df)
+    if result_format == 'arrow':
+        return to_arrow(df)
+    raise ValueError(f"Unknown result_format '{result_format}'; expected one of {', '.join(RESULT_FORMATS)}")
+
+def dumps(obj: Any) -> str:
+    """Serialize a response to JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, default=str, separators=(',', ':'))
@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config import Config
+from database import DatabaseManager, database_key, schema_generation
+from schema_context import SchemaContextBuilder
+
+class SchemaCatalog:
+    """In-process cache of every public table's columns and foreign keys.
+
+    Loaded with one information_schema query (plus one for FKs) instead of
+    one query per table. The snapshot is reused until DDL runs through a
+    DatabaseManager in this process, or until the catalog version check
+    (at most every `check_interval` seconds) sees a change made elsewhere.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, check_interval: Optional[float] = None):
+        self.db_manager = db_manager
+        self.config = db_manager.config
+        self.check_interval = Config.SCHEMA_CATALOG_CHECK_INTERVAL if check_interval is None else check_interval
+
+        self._schema: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._foreign_keys: List[Tuple[str, str, str, str]] = []
+        self._builder: Optional[SchemaContextBuilder] = None
+        self._version: Optional[str] = None
+        self._generation = -1
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+        self.loads = 0
+        self.version_checks = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._schema = None
+            self._builder = None
+
+    def _is_stale(self) -> bool:
+        if self._schema is None or self._generation != schema_generation(self.config):
+            return True
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        self.version_checks += 1
+        version = self.db_manager.get_catalog_version()
+        return version is not None and version != self._version
+
+    def _load(self):
+        generation = schema_generation(self.config)
+        version = self.db_manager.get_catalog_version()
+        result = self.db_manager.get_catalog_columns()
+        if not result["success"]:
+            raise RuntimeError(f"Failed to load schema catalog: {result['error']}")
+
+        schema: Dict[str, List[Dict[str, Any]]] = {}
+        for record in result["data"].to_dict('records'):
+            table = record.pop("table_name")
+            schema.setdefault(table, []).append(record)
+
+        self._schema = schema
+        self._foreign_keys = self.db_manager.get_foreign_keys()
+        self._builder = None
+        self._version = version
+        self._generation = generation
+        self._checked_at = time.monotonic()
+        self.loads += 1
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._is_stale():
+                try:
+                    self._load()
+                except Exception:
+                    # Serve the last snapshot rather than failing every caller
+                    if self._schema is None:
+                        raise
+
+    def get_schema(self) -> Dict[str, List[Dict[str, Any]]]:
+        """table name -> column records (column_name, data_type, is_nullable, column_default)"""
+        self._ensure_fresh()
+        return self._schema
+
+    def get_tables(self) -> List[str]:
+        return sorted(self.get_schema())
+
+    def get_foreign_keys(self) -> List[Tuple[str, str, str, str]]:
+        self._ensure_fresh()
+        return self._foreign_keys
+
+    def get_builder(self) -> SchemaContextBuilder:
+        """Prompt-context builder for the current snapshot (fingerprint computed once)"""
+        self._ensure_fresh()
+        with self._lock:
+            if self._builder is None:
+                self._builder = SchemaContextBuilder(self._schema, self._foreign_keys)
+            return self._builder
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tables": len(self._schema or {}),
+            "loads": self.loads,
+            "version_checks": self.version_checks,
+            "version": self._version
+        }
+
+_shared_catalogs: Dict[Tuple, SchemaCatalog] = {}
+_shared_catalogs_lock = threading.Lock()
+
+def get_shared_catalog(db_manager: Optional[DatabaseManager] = None) -> SchemaCatalog:
+    """Return the process-wide catalog for the configured database"""
+    db_manager = db_manager or DatabaseManager()
+    key = database_key(db_manager.config)
+    with _shared_catalogs_lock:
+        catalog = _shared_catalogs.get(key)
+        if catalog is None:
+            catalog = SchemaCatalog(db_manager)
+            _shared_catalogs[key] = catalog
+        return catalog
@@ -0,0 +1,144 @@
+import hashlib
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+# Short spellings of information_schema data types for prompt rendering
+TYPE_ABBREVIATIONS = {
+    'character varying': 'varchar',
+    'character': 'char',
+    'integer': 'int',
+    'smallint': 'smallint',
+    'bigint': 'bigint',
+    'numeric': 'numeric',
+    'double precision': 'float8',
+    'real': 'float4',
+    'boolean': 'bool',
+    'timestamp without time zone': 'timestamp',
+    'timestamp with time zone': 'timestamptz',
+    'USER-DEFINED': 'enum',
+}
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/SQL)"""
+    return len(text) // 4 + 1
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+def _words(text: str) -> List[str]:
+    return [_stem(w) for w in re.findall(r'[a-z0-9]+', text.lower())]
+
+class SchemaContextBuilder:
+    """Selects the tables and columns relevant to a question and renders them compactly.
+
+    `schema` maps table name to a list of {"column_name", "data_type"} dicts;
+    `foreign_keys` is a list of (table, column, referenced_table, referenced_column).
+    """
+
+    def __init__(self, schema: Dict[str, List[Dict[str, Any]]],
+                 foreign_keys: Optional[List[Tuple[str, str, str, str]]] = None):
+        self.schema = schema
+        self.foreign_keys = foreign_keys or []
+        self.neighbours: Dict[str, set] = {table: set() for table in schema}
+        self.fk_columns: Dict[Tuple[str, str], str] = {}
+        for table, column, ref_table, ref_column in self.foreign_keys:
+            self.neighbours.setdefault(table, set()).add(ref_table)
+            self.neighbours.setdefault(ref_table, set()).add(table)
+            self.fk_columns[(table, column)] = f"{ref_table}.{ref_column}"
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable hash of the full schema, independent of which tables a question selects"""
+        return hashlib.sha256(self.render(list(self.schema)).encode('utf-8')).hexdigest()
+
+    def _column_score(self, column: str, question_words: set) -> float:
+        parts = _words(column.replace('_', ' '))
+        if not parts:
+            return 0.0
+        matched = sum(1 for part in parts if part in question_words)
+        return matched / len(parts)
+
+    def rank(self, question: str) -> List[Tuple[str, float, List[str]]]:
+        """Score each table by name/column overlap with the question, plus FK neighbours"""
+        question_words = set(_words(question))
+        scores = {}
+        relevant_columns = {}
+        for table, columns in self.schema.items():
+            table_parts = _words(table.replace('_', ' '))
+            score = 0.0
+            if table_parts and all(part in question_words for part in table_parts):
+                score += 3.0
+            else:
+                score += sum(1.0 for part in table_parts if part in question_words)
+            matched = []
+            for col in columns:
+                col_score = self._column_score(col['column_name'], question_words)
+                if col_score:
+                    matched.append(col['column_name'])
+                    score += col_score
+            scores[table] = score
+            relevant_columns[table] = matched
+
+        # Tables joined to a strong match are likely needed for the join
+        boosted = dict(scores)
+        for table, score in scores.items():
+            if score >= 1.0:
+                for neighbour in self.neighbours.get(table, ()):
+                    if neighbour in boosted:
+                        boosted[neighbour] += 0.5 * score
+        ranked = sorted(boosted.items(), key=lambda item: (-item[1], item[0]))
+        return [(table, score, relevant_columns[table]) for table, score in ranked]
+
+    def _render_column(self, table: str, col: Dict[str, Any]) -> str:
+        data_type = TYPE_ABBREVIATIONS.get(col['data_type'], col['data_type'])
+        text = f"{col['column_name']} {data_type}"
+        ref = self.fk_columns.get((table, col['column_name']))
+        return f"{text}->{ref}" if ref else text
+
+    def render_table(self, table: str, columns: Optional[List[str]] = None) -> str:
+        cols = self.schema[table]
+        if columns is not None:
+            wanted = set(columns)
+            # Keep FK columns so joins stay expressible
+            kept = [c for c in cols if c['column_name'] in wanted or (table, c['column_name']) in self.fk_columns]
+            omitted = len(cols) - len(kept)
+            body = ', '.join(self._render_column(table, c) for c in kept)
+            return f"{table}({body}{', ...' if omitted else ''})"
+        return f"{table}({', '.join(self._render_column(table, c) for c in cols)})"
+
+    def render(self, tables: List[str]) -> str:
+        return '\n'.join(self.render_table(t) for t in tables if t in self.schema)
+
+    def build(self, question: str, token_budget: int = 1500) -> str:
+        """Compact DDL-like context for the most relevant tables within `token_budget`"""
+        if not self.schema:
+            return "No tables found in database."
+
+        ranked = self.rank(question)
+        if ranked and ranked[0][1] == 0:
+            # Nothing matched: fall back to listing tables in name order
+            ranked = sorted(ranked, key=lambda item: item[0])
+
+        lines = []
+        used = 0
+        for table, score, matched in ranked:
+            line = self.render_table(table)
+            cost = estimate_tokens(line) + 1
+            if used + cost > token_budget and matched:
+                line = self.render_table(table, matched)
+                cost = estimate_tokens(line) + 1
+            if used + cost > token_budget:
+                if lines:
+                    break
+                continue
+            lines.append(line)
+            used += cost
+
+        omitted = len(self.schema) - len(lines)
+        if omitted > 0:
+            lines.append(f"-- {omitted} less relevant tables omitted")
+        return '\n'.join(lines)
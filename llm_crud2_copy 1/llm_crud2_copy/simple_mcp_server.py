@@ -5,14 +5,36 @@ Standalone implementation without FastMCP to avoid asyncio conflicts
 """
 
 import json
+import queue
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from database import DatabaseManager
 from llm_client import LLMClient
+from schema_catalog import get_shared_catalog
+from result_cursors import CursorRegistry
+from query_pipeline import QueryPipeline
+from result_format import RESULT_FORMATS, dumps
+from config import Config
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+SUPPORTED_METHODS = {"tools/list", "tools/call"}
 
 class SimpleMCPServer:
-    def __init__(self):
+    def __init__(self, max_workers: int = None, max_in_flight: int = None):
         self.db_manager = DatabaseManager()
         self.llm_client = LLMClient()
+        self.catalog = get_shared_catalog(self.db_manager)
+        self.cursors = CursorRegistry(self.db_manager)
+        self.pipeline = QueryPipeline(self.db_manager, self.llm_client, self.catalog, self.cursors)
+        self.llm_client.set_literal_vocabulary(self.db_manager.get_categorical_values())
+        self.max_workers = max_workers or Config.MCP_MAX_WORKERS
+        self.max_in_flight = max(max_in_flight or Config.MCP_MAX_IN_FLIGHT, self.max_workers)
     
     def handle_request(self, request):
         """Handle MCP request"""
@@ -45,10 +67,37 @@ class SimpleMCPServer:
                             "inputSchema": {
                                 "type": "object", 
                                 "properties": {
-                                    "sql": {"type": "string"}
+                                    "sql": {"type": "string"},
+                                    "page_size": {"type": "integer"},
+                                    "result_format": {"type": "string", "enum": list(RESULT_FORMATS)}
                                 },
                                 "required": ["sql"]
                             }
+                        },
+                        {
+                            "name": "ask",
+                            "description": "Answer a question in one call: generate SQL, validate and execute it, return the first page of results",
+                            "inputSchema": {
+                                "type": "object",
+                                "properties": {
+                                    "query": {"type": "string"},
+                                    "schema_context": {"type": "string"},
+                                    "page_size": {"type": "integer"},
+                                    "result_format": {"type": "string", "enum": list(RESULT_FORMATS)}
+                                },
+                                "required": ["query"]
+                            }
+                        },
+                        {
+                            "name": "fetch_next",
+                            "description": "Fetch the next page of an execute_sql_query result",
+                            "inputSchema": {
+                                "type": "object",
+                                "properties": {
+                                    "token": {"type": "string"}
+                                },
+                                "required": ["token"]
+                            }
                         }
                     ]
                 }
@@ -63,6 +112,10 @@ class SimpleMCPServer:
                     return self.generate_sql(arguments)
                 elif tool_name == "execute_sql_query":
                     return self.execute_sql(arguments)
+                elif tool_name == "fetch_next":
+                    return self.fetch_next(arguments)
+                elif tool_name == "ask":
+                    return self.ask(arguments)
                 else:
                     return {"error": f"Unknown tool: {tool_name}"}
             
@@ -75,19 +128,7 @@ class SimpleMCPServer:
     def get_database_schema(self):
         """Get database schema"""
         try:
-            tables_result = self.db_manager.get_all_tables()
-            if not tables_result["success"]:
-                return {"error": "Failed to get tables"}
-            
-            schema_info = {}
-            if not tables_result["data"].empty:
-                for _, row in tables_result["data"].iterrows():
-                    table_name = row["table_name"]
-                    schema_result = self.db_manager.get_table_schema(table_name)
-                    if schema_result["success"]:
-                        schema_info[table_name] = schema_result["data"].to_dict('records')
-            
-            return {"success": True, "schema": schema_info}
+            return {"success": True, "schema": self.catalog.get_schema()}
         except Exception as e:
             return {"error": str(e)}
     
@@ -97,15 +138,18 @@ class SimpleMCPServer:
             query = arguments.get("query", "")
             schema_context = arguments.get("schema_context", "")
             
-            # Get current schema for context
-            schema_result = self.get_database_schema()
-            if schema_result.get("success"):
-                full_context = f"{schema_result['schema']}\n{schema_context}"
-            else:
-                full_context = schema_context
-            
-            result = self.llm_client.generate_sql(query, full_context)
-            return result
+            # Schema context is limited to the tables relevant to the question
+            return self.pipeline.generate(query, schema_context)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def ask(self, arguments):
+        """Generate, validate and execute SQL for a question in one call"""
+        try:
+            return self.pipeline.ask(
+                arguments.get("query", ""), arguments.get("schema_context", ""),
+                arguments.get("page_size"), arguments.get("result_format")
+            )
         except Exception as e:
             return {"success": False, "error": str(e)}
     
@@ -113,35 +157,95 @@ class SimpleMCPServer:
         """Execute SQL query"""
         try:
             sql = arguments.get("sql", "")
-            result = self.db_manager.execute_query(sql)
-            
-            # Convert DataFrame to dict for JSON serialization
-            if result.get("success") and "data" in result:
-                result["data"] = result["data"].to_dict('records')
-            
-            return result
+            return self.cursors.execute(sql, arguments.get("page_size"), arguments.get("result_format"))
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def fetch_next(self, arguments):
+        """Fetch the next page of a paged query result"""
+        try:
+            return self.cursors.fetch_next(arguments.get("token", ""))
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def run(self):
-        """Run the MCP server"""
+    def make_response(self, request, response):
+        """Wrap a handler result as a JSON-RPC response (plain dict for legacy clients)"""
+        if not isinstance(request, dict) or "jsonrpc" not in request:
+            if isinstance(request, dict) and "id" in request:
+                response = {**response, "id": request["id"]}
+            return response
+        
+        request_id = request.get("id")
+        if request.get("method") not in SUPPORTED_METHODS:
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": METHOD_NOT_FOUND, "message": response.get("error", "Method not found")}}
+        return {"jsonrpc": "2.0", "id": request_id, "result": response}
+    
+    def _write_loop(self, out, responses):
+        # Single writer: whole lines never interleave
+        while True:
+            response = responses.get()
+            if response is None:
+                break
+            out.write(dumps(response) + "\n")
+            out.flush()
+    
+    def _dispatch(self, request, responses, slots):
+        try:
+            try:
+                response = self.make_response(request, self.handle_request(request))
+            except Exception as e:
+                response = {"jsonrpc": "2.0", "id": request.get("id"),
+                            "error": {"code": INTERNAL_ERROR, "message": str(e)}}
+            # JSON-RPC notifications (no id) get no reply
+            if "jsonrpc" not in request or "id" in request:
+                responses.put(response)
+        finally:
+            slots.release()
+    
+    def run(self, stdin=None, stdout=None):
+        """Run the MCP server.
+
+        Requests are dispatched to a worker pool and each response is written
+        as soon as it is ready, tagged with its request id. At most
+        `max_in_flight` requests are accepted before reading pauses.
+        """
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
         print("🚀 Simple MCP Server started", file=sys.stderr)
         print("📡 Listening on stdin/stdout", file=sys.stderr)
         
+        responses = queue.Queue()
+        writer = threading.Thread(target=self._write_loop, args=(stdout, responses), daemon=True)
+        writer.start()
+        slots = threading.BoundedSemaphore(self.max_in_flight)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mcp-worker")
+        
         try:
-            for line in sys.stdin:
-                if line.strip():
-                    try:
-                        request = json.loads(line.strip())
-                        response = self.handle_request(request)
-                        print(json.dumps(response))
-                        sys.stdout.flush()
-                    except json.JSONDecodeError:
-                        error_response = {"error": "Invalid JSON"}
-                        print(json.dumps(error_response))
-                        sys.stdout.flush()
+            for line in stdin:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line.strip())
+                except json.JSONDecodeError:
+                    responses.put({"jsonrpc": "2.0", "id": None,
+                                   "error": {"code": PARSE_ERROR, "message": "Invalid JSON"}})
+                    continue
+                if not isinstance(request, dict):
+                    responses.put({"jsonrpc": "2.0", "id": None,
+                                   "error": {"code": INVALID_REQUEST, "message": "Request must be an object"}})
+                    continue
+                
+                # Backpressure: stop reading until a slot frees up
+                slots.acquire()
+                executor.submit(self._dispatch, request, responses, slots)
         except KeyboardInterrupt:
             print("👋 Server stopped", file=sys.stderr)
+        finally:
+            executor.shutdown(wait=True)
+            responses.put(None)
+            writer.join()
+            self.cursors.close_all()
 
 if __name__ == "__main__":
     server = SimpleMCPServer()
@@ -0,0 +1,403 @@
+import difflib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import sqlparse
+from sqlparse import tokens as T
+
+# Statements whose references must already exist; DDL creates its own names
+VALIDATED_STATEMENTS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'}
+
+# Entries in a CREATE TABLE column list that do not define a column
+TABLE_CONSTRAINTS = {'CONSTRAINT', 'PRIMARY KEY', 'UNIQUE', 'CHECK', 'FOREIGN KEY', 'EXCLUDE'}
+
+# Clauses that give a new table columns we cannot see
+INHERITED_COLUMNS = {'INHERITS', 'PARTITION OF', 'OF'}
+
+# Functions whose arguments use FROM without naming a table
+FROM_FUNCTIONS = {'extract', 'substring', 'trim', 'position', 'overlay'}
+
+# Schemas that are not part of the catalog we validate against
+EXTERNAL_SCHEMAS = {'information_schema', 'pg_catalog'}
+
+# Pseudo-relations available without a FROM clause
+PSEUDO_TABLES = {'excluded', 'new', 'old'}
+
+# Keywords a column reference can follow; after any other keyword a bare name
+# may be a keyword argument or option (AT TIME ZONE utc, ...), so it is not checked
+EXPRESSION_KEYWORDS = {
+    'SELECT', 'DISTINCT', 'WHERE', 'AND', 'OR', 'NOT', 'ON', 'ORDER BY', 'GROUP BY', 'PARTITION BY',
+    'HAVING', 'SET', 'WHEN', 'THEN', 'ELSE', 'CASE', 'RETURNING', 'IN', 'IS', 'BETWEEN', 'ALL', 'ANY',
+    'SOME', 'EXISTS', 'LIKE', 'ILIKE', 'END'
+}
+
+# Columns every Postgres table has
+SYSTEM_COLUMNS = {'ctid', 'oid', 'xmin', 'xmax', 'cmin', 'cmax', 'tableoid'}
+
+def _is_name(token) -> bool:
+    return token.ttype is T.Name or token.ttype is T.Literal.String.Symbol
+
+def _identifier(token) -> Tuple[str, bool]:
+    """(name as Postgres resolves it, quoted?)"""
+    value = token.value
+    if token.ttype is T.Literal.String.Symbol and value.startswith('"'):
+        return value[1:-1].replace('""', '"'), True
+    return value.lower(), False
+
+def _is_punctuation(token, value: str) -> bool:
+    return token.ttype is T.Punctuation and token.value == value
+
+def _relation_name(tokens: List[Any], i: int) -> Tuple[Optional[Tuple[str, bool]], int]:
+    """(name, quoted) of the possibly schema-qualified relation at tokens[i], and the index after it"""
+    while i < len(tokens) and tokens[i].ttype in T.Keyword and tokens[i].value.upper() in ('IF NOT EXISTS', 'IF EXISTS', 'ONLY'):
+        i += 1
+    if i >= len(tokens) or not _is_name(tokens[i]):
+        return None, i
+    name = _identifier(tokens[i])
+    if i + 2 < len(tokens) and _is_punctuation(tokens[i + 1], '.') and _is_name(tokens[i + 2]):
+        if name[0] in EXTERNAL_SCHEMAS:
+            return None, i + 3
+        name = _identifier(tokens[i + 2])
+        i += 2
+    return name, i + 1
+
+def _column_list(tokens: List[Any], i: int) -> Optional[Set[str]]:
+    """Names defined by the parenthesized list at tokens[i]; None when it cannot tell"""
+    if i >= len(tokens) or not _is_punctuation(tokens[i], '('):
+        return None
+    columns: Set[str] = set()
+    depth = 0
+    expect_name = False
+    for tok in tokens[i:]:
+        if _is_punctuation(tok, '('):
+            depth += 1
+            expect_name = depth == 1
+        elif _is_punctuation(tok, ')'):
+            depth -= 1
+            if depth == 0:
+                return columns
+        elif depth == 1 and _is_punctuation(tok, ','):
+            expect_name = True
+        elif depth == 1 and expect_name:
+            expect_name = False
+            if tok.value.upper() == 'LIKE':
+                # Copies another table's columns (lexed as the LIKE operator)
+                return None
+            if tok.ttype in T.Keyword and tok.value.upper() in TABLE_CONSTRAINTS:
+                continue
+            columns.add(_identifier(tok)[0])
+    return None
+
+class SQLValidator:
+    """Checks table and column references in generated SQL against the catalog.
+
+    Only reports problems it is sure about: unknown tables, qualified columns
+    that a known table lacks, and unqualified columns that no referenced table,
+    CTE or alias provides. Tables, views and columns created or altered by
+    earlier statements in the same script count as known. Anything it cannot
+    resolve is left to Postgres.
+    """
+
+    def __init__(self, tables: Dict[str, Iterable[Any]]):
+        self.columns: Dict[str, Set[str]] = {}
+        for table, columns in tables.items():
+            self.columns[table] = {c['column_name'] if isinstance(c, dict) else c for c in columns}
+
+    def _apply_ddl(self, tokens: List[Any], catalog: Dict[str, Optional[Set[str]]]):
+        """Record relations and columns a CREATE or ALTER statement adds, for later statements.
+
+        A relation whose columns cannot be read from the statement (CREATE
+        TABLE AS, views without a column list, LIKE/INHERITS) maps to None.
+        """
+        kind = next((i for i, t in enumerate(tokens)
+                     if t.ttype in T.Keyword and t.value.upper() in ('TABLE', 'VIEW')), None)
+        if kind is None:
+            return
+        ref, i = _relation_name(tokens, kind + 1)
+        if ref is None:
+            return
+
+        if tokens[0].value.upper().startswith('CREATE'):
+            columns = _column_list(tokens, i)
+            if any(t.ttype in T.Keyword and t.value.upper() in INHERITED_COLUMNS for t in tokens[i:]):
+                columns = None
+            catalog[self._resolve_table(catalog, *ref) or ref[0]] = columns
+            return
+
+        table = self._resolve_table(catalog, *ref)
+        if tokens[0].value.upper() != 'ALTER' or table is None or catalog[table] is None:
+            return
+        columns = set(catalog[table])
+        for i in range(i, len(tokens)):
+            if tokens[i].ttype not in T.Keyword or tokens[i].value.upper() not in ('ADD', 'RENAME'):
+                continue
+            j = i + 1
+            while j < len(tokens) and tokens[j].ttype in T.Keyword and tokens[j].value.upper() in ('COLUMN', 'IF NOT EXISTS'):
+                j += 1
+            rest = tokens[j:j + 3]
+            if tokens[i].value.upper() == 'ADD':
+                if rest and _is_name(rest[0]):
+                    columns.add(_identifier(rest[0])[0])
+            elif len(rest) >= 2 and rest[0].value.upper() == 'TO' and _is_name(rest[1]):
+                # RENAME TO new_table
+                catalog[_identifier(rest[1])[0]] = columns
+            elif len(rest) == 3 and _is_name(rest[0]) and rest[1].value.upper() == 'TO' and _is_name(rest[2]):
+                # RENAME [COLUMN] old TO new
+                columns.discard(_identifier(rest[0])[0])
+                columns.add(_identifier(rest[2])[0])
+        catalog[table] = columns
+
+    def _suggest(self, name: str, choices: Iterable[str]) -> str:
+        choices = list(choices)
+        lowered = {c.lower(): c for c in choices}
+        if name.lower() in lowered:
+            return f"; did you mean {lowered[name.lower()]}?"
+        close = difflib.get_close_matches(name, choices, n=1, cutoff=0.75)
+        return f"; did you mean {close[0]}?" if close else ""
+
+    def _scan(self, tokens: List[Any]) -> Dict[str, Any]:
+        """Collect table references, aliases, CTE names and column references"""
+        tables: List[Tuple[str, bool]] = []
+        aliases: Dict[str, Optional[str]] = {}
+        ctes: Set[str] = set()
+        derived: Set[str] = set()
+        columns: List[Tuple[Optional[str], str, bool]] = []
+        insert_columns: List[Tuple[str, str, bool]] = []
+        table_functions = False
+
+        # (opening function name or '', opened inside a FROM list?)
+        parens: List[Tuple[str, bool]] = []
+        table_context = False
+        insert_target = None
+        alias_list_depth = None
+        i = 0
+        while i < len(tokens):
+            tok = tokens[i]
+            prev = tokens[i - 1] if i > 0 else None
+            nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+            upper = tok.value.upper()
+
+            if tok.ttype is T.Punctuation and tok.value == '(':
+                opener = prev.value.lower() if prev is not None and _is_name(prev) else ''
+                if insert_target is not None and opener:
+                    opener = 'insert'
+                elif table_context and opener:
+                    # Set-returning function in FROM: its columns are unknown
+                    table_functions = True
+                parens.append((opener, table_context))
+                table_context = False
+                i += 1
+                continue
+            if tok.ttype is T.Punctuation and tok.value == ')':
+                if parens:
+                    closed, in_from = parens.pop()
+                    if closed == 'insert':
+                        insert_target = None
+                    # A subquery or function in FROM is followed by its alias
+                    table_context = in_from
+                if alias_list_depth is not None and len(parens) < alias_list_depth:
+                    alias_list_depth = None
+                i += 1
+                continue
+
+            if tok.ttype in T.Keyword:
+                if upper == 'FROM' and parens and parens[-1][0] in FROM_FUNCTIONS:
+                    table_context = False
+                elif upper in ('FROM', 'INTO') or upper.endswith('JOIN'):
+                    table_context = True
+                elif upper == 'USING' and not (nxt is not None and _is_punctuation(nxt, '(')):
+                    # DELETE ... USING other_table (JOIN ... USING (col) lists columns)
+                    table_context = True
+                elif upper == 'UPDATE' and not (nxt is not None and nxt.value.upper() == 'SET'):
+                    table_context = True
+                elif upper in ('ONLY', 'LATERAL', 'AS'):
+                    pass
+                else:
+                    table_context = False
+                i += 1
+                continue
+
+            if not _is_name(tok):
+                if not (tok.ttype is T.Punctuation and tok.value == ','):
+                    table_context = table_context and tok.ttype is T.Punctuation and tok.value == '.'
+                i += 1
+                continue
+
+            name, quoted = _identifier(tok)
+
+            if prev is not None and prev.ttype in T.Keyword and prev.value.upper() == 'COLLATE':
+                # Collation name, possibly schema-qualified: COLLATE "C", COLLATE pg_catalog."default"
+                qualified = nxt is not None and _is_punctuation(nxt, '.')
+                i += 3 if qualified else 1
+                continue
+
+            if parens and parens[-1][0] == 'extract' and prev is not None and _is_punctuation(prev, '('):
+                # Field name: EXTRACT(EPOCH FROM ts)
+                i += 1
+                continue
+
+            # Qualified reference: a.b
+            if nxt is not None and nxt.ttype is T.Punctuation and nxt.value == '.':
+                target = tokens[i + 2] if i + 2 < len(tokens) else None
+                if table_context:
+                    if target is not None and _is_name(target):
+                        table_name, table_quoted = _identifier(target)
+                        if name not in EXTERNAL_SCHEMAS:
+                            tables.append((table_name, table_quoted))
+                            aliases.setdefault(table_name, table_name)
+                        else:
+                            aliases.setdefault(table_name, None)
+                    i += 3
+                    continue
+                if target is not None and _is_name(target):
+                    column, column_quoted = _identifier(target)
+                    columns.append((name, column, column_quoted))
+                i += 3
+                continue
+
+            if prev is not None and prev.ttype is T.Punctuation and prev.value == '::':
+                # Type name in a cast
+                i += 1
+                continue
+
+            if prev is not None and prev.ttype in T.Keyword and prev.value.upper() == 'AS':
+                if nxt is not None and nxt.ttype is T.Punctuation and nxt.value == '(':
+                    # alias(col, ...) lists name output columns
+                    alias_list_depth = len(parens) + 1
+                aliases[name] = aliases.get(name)
+                derived.add(name)
+                i += 1
+                continue
+
+            if nxt is not None and nxt.ttype in T.Keyword and nxt.value.upper() == 'AS':
+                after = tokens[i + 2] if i + 2 < len(tokens) else None
+                if after is not None and after.ttype is T.Punctuation and after.value == '(':
+                    ctes.add(name)
+                    i += 1
+                    continue
+
+            if alias_list_depth is not None:
+                derived.add(name)
+                i += 1
+                continue
+
+            if table_context:
+                if prev is not None and (_is_name(prev) or (prev.ttype is T.Punctuation and prev.value == ')')):
+                    # Implicit alias: FROM users u
+                    aliases[name] = aliases.get(prev.value.lower(), prev.value.lower())
+                    derived.add(name)
+                elif nxt is not None and nxt.ttype is T.Punctuation and nxt.value == '(' \
+                        and not (prev is not None and prev.value.upper() == 'INTO'):
+                    # Table function such as generate_series(...)
+                    pass
+                else:
+                    tables.append((name, quoted))
+                    aliases.setdefault(name, name)
+                    if prev is not None and prev.ttype in T.Keyword and prev.value.upper() == 'INTO':
+                        insert_target = name
+                i += 1
+                continue
+
+            if nxt is not None and nxt.ttype is T.Punctuation and nxt.value == '(':
+                # Function call
+                i += 1
+                continue
+
+            if prev is not None and (_is_name(prev) or (prev.ttype is T.Punctuation and prev.value == ')')) \
+                    and not (parens and parens[-1][0] == 'insert'):
+                # Implicit column alias: SELECT count(*) total
+                derived.add(name)
+                i += 1
+                continue
+
+            if parens and parens[-1][0] == 'insert' and insert_target is not None:
+                insert_columns.append((insert_target, name, quoted))
+            elif prev is not None and prev.ttype in T.Keyword and prev.value.upper() not in EXPRESSION_KEYWORDS:
+                # Unsure what this name is; leave it to Postgres
+                derived.add(name)
+            else:
+                columns.append((None, name, quoted))
+            i += 1
+
+        return {
+            "tables": tables, "aliases": aliases, "ctes": ctes, "derived": derived,
+            "columns": columns, "insert_columns": insert_columns, "table_functions": table_functions
+        }
+
+    def _resolve_table(self, catalog: Dict[str, Optional[Set[str]]], name: str, quoted: bool) -> Optional[str]:
+        if name in catalog:
+            return name
+        if not quoted:
+            for table in catalog:
+                if table.lower() == name:
+                    return table
+        return None
+
+    def _has_column(self, catalog: Dict[str, Optional[Set[str]]], table: str, column: str, quoted: bool) -> bool:
+        if catalog[table] is None or column in catalog[table]:
+            return True
+        return not quoted and any(c.lower() == column for c in catalog[table])
+
+    def validate(self, sql: str) -> Dict[str, Any]:
+        """{"valid": bool, "errors": [str]} for every statement in `sql`"""
+        errors: List[str] = []
+        # Relations created or altered earlier in the script are known to later statements
+        catalog: Dict[str, Optional[Set[str]]] = dict(self.columns)
+        for statement in sqlparse.parse(sql):
+            first = statement.token_first(skip_ws=True, skip_cm=True)
+            if first is None:
+                continue
+            tokens = [t for t in statement.flatten() if not t.is_whitespace and t.ttype not in T.Comment]
+            if first.value.upper() not in VALIDATED_STATEMENTS:
+                if first.ttype is T.Keyword.DDL:
+                    self._apply_ddl(tokens, catalog)
+                continue
+            scan = self._scan(tokens)
+
+            referenced = []
+            unresolved = scan["table_functions"]
+            for name, quoted in scan["tables"]:
+                if name in scan["ctes"]:
+                    unresolved = True
+                    continue
+                table = self._resolve_table(catalog, name, quoted)
+                if table is None:
+                    errors.append(f'relation "{name}" does not exist' + self._suggest(name, catalog))
+                    unresolved = True
+                elif catalog[table] is None:
+                    unresolved = True
+                else:
+                    referenced.append(table)
+
+            for table_ref, column, quoted in scan["insert_columns"]:
+                table = self._resolve_table(catalog, table_ref, False)
+                if table and not self._has_column(catalog, table, column, quoted):
+                    errors.append(f'column "{column}" of relation "{table}" does not exist'
+                                  + self._suggest(column, catalog[table]))
+
+            known_columns = {c for t in referenced for c in catalog[t]}
+            known_lower = {c.lower() for c in known_columns}
+            for qualifier, column, quoted in scan["columns"]:
+                if qualifier is not None:
+                    if qualifier in PSEUDO_TABLES:
+                        continue
+                    target = scan["aliases"].get(qualifier, qualifier)
+                    table = self._resolve_table(catalog, target, False) if target else None
+                    if table is None:
+                        continue
+                    if not self._has_column(catalog, table, column, quoted):
+                        errors.append(f'column {qualifier}.{column} does not exist'
+                                      + self._suggest(column, catalog[table]))
+                    continue
+
+                if column in SYSTEM_COLUMNS or column in scan["derived"] or column in scan["aliases"] \
+                        or column in scan["ctes"]:
+                    continue
+                if column in known_columns or (not quoted and column in known_lower):
+                    continue
+                if unresolved or not referenced:
+                    # Could come from a CTE or an unknown relation; let Postgres decide
+                    continue
+                errors.append(f'column "{column}" does not exist' + self._suggest(column, known_columns))
+
+        # Keep the first occurrence of each message
+        errors = list(dict.fromkeys(errors))
+        return {"valid": not errors, "errors": errors}
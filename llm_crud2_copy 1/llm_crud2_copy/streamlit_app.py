@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 from database import DatabaseManager
 from llm_client import LLMClient
+from schema_catalog import get_shared_catalog
+from query_pipeline import QueryPipeline
+from config import Config
 import sqlparse
 from typing import Dict, Any
 
@@ -17,8 +20,13 @@ if 'db_manager' not in st.session_state:
     st.session_state.db_manager = DatabaseManager()
 if 'llm_client' not in st.session_state:
     st.session_state.llm_client = LLMClient()
+    st.session_state.llm_client.set_literal_vocabulary(st.session_state.db_manager.get_categorical_values())
+if 'pipeline' not in st.session_state:
+    st.session_state.pipeline = QueryPipeline(st.session_state.db_manager, st.session_state.llm_client)
 if 'query_history' not in st.session_state:
     st.session_state.query_history = []
+    # History entries already handed to prefetch_explanations
+    st.session_state.explained_history = 0
 
 def format_sql(sql: str) -> str:
     """Format SQL query for better readability"""
@@ -29,69 +37,61 @@ def format_sql(sql: str) -> str:
 
 def execute_natural_language_query(user_input: str):
     """Process natural language query and execute SQL"""
-    with st.spinner("🤖 Converting to SQL..."):
-        # Get current schema for context
-        schema_info = get_schema_context()
-        
-        # Generate SQL
-        llm_result = st.session_state.llm_client.generate_sql(user_input, schema_info)
+    sql_placeholder = st.empty()
+    
+    def show_sql(llm_result: Dict[str, Any]):
+        # Display generated SQL; the history tab explains it on demand or in a batched prefetch
+        sql_placeholder.code(format_sql(llm_result["sql"]), language="sql")
+        if llm_result.get("repaired"):
+            st.caption(f"🔧 Repaired after validation: {'; '.join(llm_result['validation_errors'])}")
+        if llm_result.get("latency"):
+            latency = llm_result["latency"]
+            st.caption(f"First token {latency['ttft_ms']:.0f} ms · SQL ready in {latency['total_ms']:.0f} ms")
+    
+    with st.spinner("🤖 Converting to SQL and executing..."):
+        # Same pipeline as the MCP `ask` tool: schema -> SQL (streamed in) -> validation -> execution
+        answer = st.session_state.pipeline.ask(
+            user_input,
+            on_token=lambda partial: sql_placeholder.code(partial, language="sql"),
+            on_sql=show_sql
+        )
         
-        if not llm_result["success"]:
-            st.error(f"❌ Failed to generate SQL: {llm_result['error']}")
+        if answer["stage"] == "generate":
+            if answer.get("validation_errors"):
+                # Rejected before reaching the database
+                sql_placeholder.code(format_sql(answer["sql"]), language="sql")
+            else:
+                sql_placeholder.empty()
+            st.error(f"❌ Failed to generate SQL: {answer['error']}")
             return
         
-        sql_query = llm_result["sql"]
-        
-        # Display generated SQL
-        st.code(format_sql(sql_query), language="sql")
+        sql_query = answer["sql"]
+        result = answer["result"]
+        st.caption(" · ".join(f"{stage[:-3]} {ms:.0f} ms" for stage, ms in answer["timings"].items()))
         
-        # Execute SQL
-        with st.spinner("⚡ Executing query..."):
-            result = st.session_state.db_manager.execute_query(sql_query)
+        if result["success"]:
+            st.success(f"✅ Query executed successfully! Rows affected: {result.get('rows_affected', 0)}")
             
-            if result["success"]:
-                st.success(f"✅ Query executed successfully! Rows affected: {result.get('rows_affected', 0)}")
-                
-                # Display results if it's a SELECT query
-                if "data" in result and not result["data"].empty:
-                    st.subheader("📊 Query Results")
-                    st.dataframe(result["data"], use_container_width=True)
-                
-                # Add to history
-                st.session_state.query_history.append({
-                    "natural_language": user_input,
-                    "sql": sql_query,
-                    "success": True,
-                    "rows_affected": result.get('rows_affected', 0)
-                })
-            else:
-                st.error(f"❌ Query failed: {result['error']}")
-                st.session_state.query_history.append({
-                    "natural_language": user_input,
-                    "sql": sql_query,
-                    "success": False,
-                    "error": result['error']
-                })
-
-def get_schema_context() -> str:
-    """Get database schema information for LLM context"""
-    try:
-        tables_result = st.session_state.db_manager.get_all_tables()
-        if not tables_result["success"] or tables_result["data"].empty:
-            return "No tables found in database."
-        
-        schema_info = "Database Schema:\n"
-        for _, row in tables_result["data"].iterrows():
-            table_name = row["table_name"]
-            schema_result = st.session_state.db_manager.get_table_schema(table_name)
-            if schema_result["success"] and not schema_result["data"].empty:
-                schema_info += f"\nTable: {table_name}\n"
-                for _, col_row in schema_result["data"].iterrows():
-                    schema_info += f"  - {col_row['column_name']}: {col_row['data_type']}\n"
-        
-        return schema_info
-    except:
-        return "Schema information unavailable."
+            # Display results if it's a SELECT query
+            if "data" in result and not result["data"].empty:
+                st.subheader("📊 Query Results")
+                st.dataframe(result["data"], use_container_width=True)
+            
+            # Add to history
+            st.session_state.query_history.append({
+                "natural_language": user_input,
+                "sql": sql_query,
+                "success": True,
+                "rows_affected": result.get('rows_affected', 0)
+            })
+        else:
+            st.error(f"❌ Query failed: {result['error']}")
+            st.session_state.query_history.append({
+                "natural_language": user_input,
+                "sql": sql_query,
+                "success": False,
+                "error": result['error']
+            })
 
 # Main UI
 st.title("🗃️ LLM SQL CRUD Assistant")
@@ -111,16 +111,24 @@ with st.sidebar:
     st.header("📋 Database Schema")
     
     # Show tables
-    tables_result = st.session_state.db_manager.get_all_tables()
-    if tables_result["success"] and not tables_result["data"].empty:
-        for _, row in tables_result["data"].iterrows():
-            table_name = row["table_name"]
+    try:
+        catalog_schema = get_shared_catalog(st.session_state.db_manager).get_schema()
+    except Exception:
+        catalog_schema = {}
+    if catalog_schema:
+        for table_name in sorted(catalog_schema):
             with st.expander(f"📊 {table_name}"):
-                schema_result = st.session_state.db_manager.get_table_schema(table_name)
-                if schema_result["success"]:
-                    st.dataframe(schema_result["data"], use_container_width=True)
+                st.dataframe(pd.DataFrame(catalog_schema[table_name]), use_container_width=True)
     else:
         st.info("No tables found")
+    
+    st.header("⚡ Performance")
+    fast_path = st.session_state.llm_client.metrics()["fast_path"]
+    if fast_path.get("lookups"):
+        st.metric("Fast-path hit rate", f"{fast_path['hit_rate']:.0%}",
+                  help=f"{fast_path['hits']} of {fast_path['lookups']} questions answered without the LLM")
+    else:
+        st.caption("No questions asked yet")
 
 # Main content
 tab1, tab2, tab3 = st.tabs(["💬 Natural Language Query", "⚡ Direct SQL", "📈 Query History"])
@@ -172,10 +180,23 @@ with tab3:
     st.header("📈 Query History")
     
     if st.session_state.query_history:
+        llm_client = st.session_state.llm_client
+        # Explain new entries in one batched call without blocking the page; reruns add nothing
+        new_entries = st.session_state.query_history[st.session_state.explained_history:]
+        if new_entries:
+            llm_client.prefetch_explanations([q['sql'] for q in new_entries], background=True)
+            st.session_state.explained_history = len(st.session_state.query_history)
+        
         for i, query in enumerate(reversed(st.session_state.query_history)):
             with st.expander(f"Query {len(st.session_state.query_history) - i}: {query['natural_language'][:50]}..."):
                 st.write("**Natural Language:**", query['natural_language'])
                 st.code(format_sql(query['sql']), language="sql")
+                explanation = llm_client.get_cached_explanation(query['sql'])
+                if explanation:
+                    st.write("**Explanation:**", explanation)
+                elif st.button("💡 Explain", key=f"explain_{i}"):
+                    # Joins a prefetch still explaining this query rather than calling again
+                    st.write("**Explanation:**", llm_client.explain_query_async(query['sql']).result())
                 if query['success']:
                     st.success(f"✅ Success - Rows affected: {query['rows_affected']}")
                 else:
@@ -6,9 +6,12 @@ Tests all components to ensure everything works correctly
 
 import os
 import sys
+import tempfile
 from database import DatabaseManager
 from llm_client import LLMClient
 from config import Config
+from llm_cache import SemanticCache
+from sql_validator import SQLValidator
 
 def test_config():
     """Test configuration loading"""
@@ -105,6 +108,82 @@ def test_integration():
         print(f"❌ Integration test error: {e}")
         return False
 
+def test_semantic_cache():
+    """Near-miss questions must not reuse each other's SQL"""
+    print("🧠 Testing semantic cache near misses...")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SemanticCache(os.path.join(tmp, "cache.sqlite3"))
+            scope, model = "schema", "model"
+            cache.add("delete all students whose exam score is above 70 and attendance is below 60 and gender is Male",
+                      scope, model, "DELETE FROM students WHERE exam_score > 70 AND attendance < 60 AND gender = 'Male'")
+            cache.add("show all students whose exam score is above 70", scope, model,
+                      "SELECT * FROM students WHERE exam_score > 70")
+            cache.add("count students by gender", scope, model,
+                      "SELECT gender, count(*) FROM students GROUP BY gender")
+            cache.add("list students sorted by exam score ascending", scope, model,
+                      "SELECT * FROM students ORDER BY exam_score ASC")
+
+            near_misses = [
+                "show all students whose exam score is above 70 and attendance is below 60 and gender is Male",
+                "show all students whose exam score is below 70",
+                "average students by gender",
+                "list students sorted by exam score descending",
+            ]
+            for question in near_misses:
+                hit = cache.lookup(question, scope, model)
+                if hit is not None:
+                    print(f"❌ '{question}' reused: {hit['sql']}")
+                    return False
+
+            hit = cache.lookup("display the students with exam score above 70", scope, model)
+            if hit is None or not hit["sql"].startswith("SELECT"):
+                print("❌ A plain rephrase did not hit the cache")
+                return False
+        print("✅ Semantic cache only reuses matching read-only SQL")
+        return True
+    except Exception as e:
+        print(f"❌ Semantic cache error: {e}")
+        return False
+
+def test_sql_validator():
+    """Valid PostgreSQL must pass validation; real mistakes must not"""
+    print("🔎 Testing SQL validator...")
+    try:
+        validator = SQLValidator({
+            "students": ["id", "name", "class_id", "grade", "enrolled_at"],
+            "classes": ["id", "grade"]
+        })
+        valid = [
+            "SELECT EXTRACT(EPOCH FROM enrolled_at) FROM students",
+            "SELECT EXTRACT(DOW FROM enrolled_at), count(*) FROM students GROUP BY 1",
+            "DELETE FROM students USING classes WHERE students.class_id = classes.id AND classes.grade = 'A'",
+            "UPDATE students SET grade = c.grade FROM classes c WHERE students.class_id = c.id",
+            "SELECT name FROM students ORDER BY name COLLATE \"C\"",
+            "SELECT s.name FROM students s JOIN classes USING (id)",
+            "CREATE TABLE products (id SERIAL PRIMARY KEY, name TEXT); INSERT INTO products (name) VALUES ('pen')",
+        ]
+        for sql in valid:
+            result = validator.validate(sql)
+            if not result["valid"]:
+                print(f"❌ Rejected valid SQL: {sql} ({'; '.join(result['errors'])})")
+                return False
+
+        invalid = [
+            "SELECT nme FROM students",
+            "DELETE FROM students USING clases WHERE students.class_id = clases.id",
+            "SELECT s.nme FROM students s ORDER BY s.name COLLATE \"C\"",
+        ]
+        for sql in invalid:
+            if validator.validate(sql)["valid"]:
+                print(f"❌ Accepted invalid SQL: {sql}")
+                return False
+        print("✅ SQL validator accepts valid PostgreSQL and catches bad references")
+        return True
+    except Exception as e:
+        print(f"❌ SQL validator error: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("🧪 Starting System Tests for LLM SQL CRUD Assistant")
@@ -114,7 +193,9 @@ def main():
         ("Configuration", test_config),
         ("Database", test_database),
         ("LLM Client", test_llm_client),
-        ("Integration", test_integration)
+        ("Integration", test_integration),
+        ("Semantic Cache", test_semantic_cache),
+        ("SQL Validator", test_sql_validator)
     ]
     
     passed = 0
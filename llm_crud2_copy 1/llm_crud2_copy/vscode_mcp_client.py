@@ -4,6 +4,7 @@ Simple MCP Client for VSCode
 Communicates with our MCP server for testing
 """
 
+import itertools
 import json
 import subprocess
 import sys
@@ -13,6 +14,7 @@ class VSCodeMCPClient:
     def __init__(self, server_path: str):
         self.server_path = server_path
         self.server_process = None
+        self.request_ids = itertools.count(1)
     
     def start_server(self):
         """Start the MCP server process"""
@@ -36,9 +38,10 @@ class VSCodeMCPClient:
         if not self.server_process:
             return {"error": "Server not started"}
         
+        request_id = next(self.request_ids)
         request = {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": request_id,
             "method": method,
             "params": params or {}
         }
@@ -49,12 +52,14 @@ class VSCodeMCPClient:
             self.server_process.stdin.write(request_json)
             self.server_process.stdin.flush()
             
-            # Read response
-            response_line = self.server_process.stdout.readline()
-            if response_line:
-                return json.loads(response_line.strip())
-            else:
-                return {"error": "No response from server"}
+            # Read responses until ours arrives; the server may answer out of order
+            while True:
+                response_line = self.server_process.stdout.readline()
+                if not response_line:
+                    return {"error": "No response from server"}
+                response = json.loads(response_line.strip())
+                if response.get("id") == request_id:
+                    return response
                 
         except Exception as e:
             return {"error": f"Communication error: {e}"}
@@ -82,9 +87,23 @@ class VSCodeMCPClient:
             "schema_context": schema_context
         })
     
-    def execute_sql(self, sql: str):
+    def execute_sql(self, sql: str, page_size: int = None):
         """Execute SQL query"""
-        return self.call_tool("execute_sql_query", {"sql": sql})
+        arguments = {"sql": sql}
+        if page_size:
+            arguments["page_size"] = page_size
+        return self.call_tool("execute_sql_query", arguments)
+    
+    def ask(self, query: str, page_size: int = None):
+        """Generate and execute SQL for a question in one round trip"""
+        arguments = {"query": query}
+        if page_size:
+            arguments["page_size"] = page_size
+        return self.call_tool("ask", arguments)
+    
+    def fetch_next(self, token: str):
+        """Fetch the next page of a query result"""
+        return self.call_tool("fetch_next", {"token": token})
     
     def stop_server(self):
         """Stop the MCP server"""
@@ -102,6 +121,7 @@ def main():
     
     try:
         print("\n🔌 MCP Client Started - Type 'help' for commands")
+        next_token = None
         
         while True:
             command = input("\n> ").strip().lower()
@@ -111,7 +131,9 @@ def main():
 Available commands:
   schema     - Get database schema
   sql <query> - Generate SQL from natural language
+  ask <query> - Generate and execute SQL in one call
   exec <sql>  - Execute SQL query
+  next       - Fetch the next page of the last query
   tools      - List available tools
   quit       - Exit client
                 """)
@@ -125,10 +147,25 @@ Available commands:
                 result = client.generate_sql(query)
                 print(json.dumps(result, indent=2))
             
+            elif command.startswith("ask "):
+                result = client.ask(command[4:])
+                payload = result.get("result", result)
+                next_token = (payload.get("result") or {}).get("next_token")
+                print(json.dumps(result, indent=2, default=str))
+            
             elif command.startswith("exec "):
                 sql = command[5:]
                 result = client.execute_sql(sql)
-                print(json.dumps(result, indent=2))
+                next_token = result.get("result", result).get("next_token")
+                print(json.dumps(result, indent=2, default=str))
+            
+            elif command == "next":
+                if not next_token:
+                    print("No more pages.")
+                    continue
+                result = client.fetch_next(next_token)
+                next_token = result.get("result", result).get("next_token")
+                print(json.dumps(result, indent=2, default=str))
             
             elif command == "tools":
                 result = client.list_tools()